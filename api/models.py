@@ -1,6 +1,7 @@
 # api/models.py
-import streamlit as st
-from crewai import LLM
+import os
+import threading
+from collections import OrderedDict
 
 
 COMMERCIAL_MODELS = {
@@ -18,6 +19,11 @@ COMMERCIAL_MODELS = {
     ],
 }
 
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "32"))
+
+_models: "OrderedDict[tuple, object]" = OrderedDict()
+_models_lock = threading.Lock()
+
 def get_company_name(model_name: str) -> str:
     """
     Get the company name associated with a given model.
@@ -39,10 +45,13 @@ def get_company_name(model_name: str) -> str:
 
 def get_model(model: str, **kwargs) -> object:
     """
-    Get the mode object named with a given model.
+    Get the mode object named with a given model. Instances are shared per model
+    and options (including the API key), so Streamlit reruns and repeated runs
+    reuse the same client.
 
     Args:
         model (str): The name of the model to look up.
+        **kwargs: Options for the LLM, e.g. `api_key` or a per-request `timeout`.
 
     Returns:
         str: The instance of the LLM model.
@@ -50,11 +59,34 @@ def get_model(model: str, **kwargs) -> object:
     Raises:
         NotImplementedError: If the model does not implemented yet.
     """
+    from crewai import LLM  # Deferred: crewai takes seconds to import
+
     if get_company_name(model) == "opensource":
         raise NotImplementedError(f"{get_company_name(model)} is not supported. (Current model: {model})")
     if get_company_name(model) in COMMERCIAL_MODELS.keys():
-        if "api_key" in kwargs.keys():
-            return LLM(model=model, api_key=kwargs.get("api_key"))
-        return LLM(model=model)
+        # Forwards `api_key`, `timeout` and other LLM options as given.
+        try:
+            key = (model, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return LLM(model=model, **kwargs)  # Unhashable options (e.g. callbacks) are never shared
+        with _models_lock:
+            if key in _models:
+                _models.move_to_end(key)
+                return _models[key]
+        llm = LLM(model=model, **kwargs)
+        with _models_lock:
+            llm = _models.setdefault(key, llm)
+            while len(_models) > MODEL_CACHE_SIZE:
+                _models.popitem(last=False)
+        return llm
     else:
         raise NotImplementedError(f"{get_company_name(model)} is not supported. (Current model: {model})")
+
+
+def clear_model_cache() -> None:
+    """
+    Drops every shared LLM instance, e.g. after API keys were rotated.
+    """
+    with _models_lock:
+        _models.clear()
@@ -2,26 +2,36 @@
 import master
 
 
-import os
+import functools
 
-import json
 import streamlit as st
 
 from api.registry import get_api_key
 from api.models import get_model, COMMERCIAL_MODELS
-from crews.crew import run_crew
+from crews.routing import ROUTING_PROFILE, ROUTING_PROFILES, VISION_ROUTE, resolve_routes
+from crews.settings import EXECUTION_MODES, MODEL
 from utils.logs import LoggerSetup
 from utils.components import (page_config, 
                               login, 
                               image_handler, 
                               task_handler, 
-                              select_model)
-from utils.functions import get_args, extract_caption, transform_to_json_format_debug_fixed, json_to_md_table, json_to_html_table, get_tasks_into_chart
+                              select_model,
+                              session_owner,
+                              job_panel)
+from utils.functions import get_args
+from utils.crews import get_provider_api_keys, set_openai_api_key_for_crewtools
+from utils.images import pin_images
+from utils.jobs import job_manager
+from utils.metrics import RunMetrics, start_metrics_server
+from utils.warmup import warm_up
 
 
 # Set logger
 logger = LoggerSetup("app").logger
 
+# Prometheus endpoint, when METRICS_PORT is set
+start_metrics_server()
+
 # Main Page
 page_config("위험성평가 자동 생성 LLM")
 
@@ -33,6 +43,43 @@ st.sidebar.subheader("모델 선택")
 model_options = get_args(**COMMERCIAL_MODELS)
 selected_model = st.sidebar.selectbox("모델을 선택하세요:", model_options, help="Notice: 성능이 상대적으로 좋지 않은 모델은 렌더링 오류를 유발할 수 있습니다.")
 
+execution_mode = st.sidebar.selectbox(
+    "실행 방식을 선택하세요:",
+    EXECUTION_MODES,
+    format_func={"hierarchical": "계층형 (매니저 + 계획 수립)", "sequential": "순차형 (빠른 실행)"}.get,
+    help="순차형은 계획 수립과 매니저 위임 단계를 생략하고 식별 → 평가 → 저감 순서로 바로 진행합니다."
+)
+
+routing_profile = st.sidebar.selectbox(
+    "에이전트 모델 구성을 선택하세요:",
+    list(ROUTING_PROFILES),
+    index=list(ROUTING_PROFILES).index(ROUTING_PROFILE),
+    format_func={
+        "configured": "기본 구성 (식별·평가 경량 모델, 저감 대책 고성능 모델)",
+        "economy": "경량 (전체 gpt-4o-mini)",
+        "quality": "고성능 (전체 gpt-4o)",
+    }.get,
+    help="에이전트와 도구마다 알맞은 크기의 모델을 사용해 응답 시간과 비용을 줄입니다. 매니저는 위에서 선택한 모델을 사용합니다."
+)
+
+# Per-route overrides on top of the profile; keyed by profile so that switching profiles resets them.
+route_labels = {
+    "integrated_risk_detector": "위험 요인 식별",
+    "risk_assessment_expert": "위험성 평가",
+    "risk_reduction_expert": "위험 저감 대책",
+    VISION_ROUTE: "이미지 분석 도구",
+    "planning": "계획 수립 (계층형)",
+}
+profile_routes = resolve_routes(routing_profile)
+route_overrides = {}
+with st.sidebar.expander("에이전트별 모델 변경"):
+    for route, label in route_labels.items():
+        options = COMMERCIAL_MODELS["OpenAI"] if route == VISION_ROUTE else COMMERCIAL_MODELS["OpenAI"] + COMMERCIAL_MODELS["Anthropic"]
+        choice = st.selectbox(label, options, index=options.index(profile_routes[route]), key=f"route-{routing_profile}-{route}")
+        if choice != profile_routes[route]:
+            route_overrides[route] = choice
+routes = resolve_routes(routing_profile, route_overrides)
+
 # Retrieve the API key
 api_key = get_api_key(model_name=selected_model)
 select_model(select_model=selected_model)
@@ -41,33 +88,40 @@ select_model(select_model=selected_model)
 st.sidebar.subheader("작업 입력")
 image_path = image_handler("이미지를 업로드하세요:")
 task = task_handler("작업을 입력하세요:", "공종: 빔 거푸집 설치 작업, 공정: 자재 인양")
+structured = st.sidebar.checkbox("구조화 출력 모드", value=False, help="평가와 저감 대책을 정해진 스키마로 검증된 형식으로 받아, 형식 오류로 인한 실패를 줄입니다.")
+use_cache = st.sidebar.checkbox("저장된 결과 재사용", value=True, help="동일한 이미지와 작업에 대해 이전에 생성된 평가표를 즉시 불러오고, 거의 같은 이미지는 이전 이미지 분석 결과를 재사용합니다. 해제하면 새로 분석하여 저장된 결과를 갱신합니다.")
 
 # 위험성 평가 실행 버튼
+owner = session_owner()
 if st.sidebar.button("위험성 평가표 작성하기"):
-    logger.debug(f"Running in progress. Task: {task}")
-    with st.spinner("위험성 평가표를 생성 중, 잠시만 기다려주세요. (예상 소요 시간: 1~3분)"):
-        # Run crews
-        try:
-            result = run_crew(get_model(selected_model, api_key=api_key), image_path, task)
-        except Exception as e:
-            st.error(f"작업 처리 중 오류 발생: {e}")
-            logger.error(f"Error: {e}")
-            st.stop()
-        
-        # 결과 처리
-        try:
-            st.markdown(f"### [평가대상작업] {get_tasks_into_chart(task)}")
-            json_format_output = transform_to_json_format_debug_fixed(result.raw)
-            table = json_to_html_table(json_format_output)
-            st.html(table)
-        except Exception as e:
-            st.error("결과 형식이 올바르지 않습니다.")
-            logger.error(e)
-            st.stop()
-
-    # st.markdown(f"<details><summary><h3>펼쳐서 Agent 생각 보기 👇</h3></summary>{"\n".join(result.tasks_output)}</details>", unsafe_allow_html=True)
-    st.markdown("### 펼쳐서 Agent 생각 보기 👇")
-    st.json(result.tasks_output, expanded=False)
-    st.markdown("### 펼쳐서 Raw 데이터 보기 👇")
-    st.json(result, expanded=False)
-    st.success("위험성 평가표 작성이 완료되었습니다.")
+    logger.debug(f"Job submitted. Task: {task}")
+    from crews.crew import run_crew  # Usually already imported by `warm_up`
+
+    # Resolve everything that needs the Streamlit session here: worker threads have none.
+    model = get_model(selected_model, api_key=api_key)
+    tools_api_key = set_openai_api_key_for_crewtools(MODEL)
+    api_keys = get_provider_api_keys(routes)
+    metrics = RunMetrics(mode=execution_mode, model=selected_model)
+    run = functools.partial(run_crew, model, image_path, task, use_cache=use_cache, mode=execution_mode, metrics=metrics,
+                            structured=structured, tools_api_key=tools_api_key, routes=routes, api_keys=api_keys)
+
+    # Bind `run` now: script globals are reassigned on the next rerun.
+    # The uploaded images stay in memory until the job has ended, even if more are uploaded meanwhile.
+    job = job_manager.submit(owner, task, lambda job, run=run: run(step_callback=job.on_step, task_callback=job.on_task),
+                             on_finish=pin_images(image_path))
+    job.extra["metrics"] = metrics
+    st.toast(f"위험성 평가 작업이 등록되었습니다. (작업 ID {job.id})")
+
+# Shared crews, models and tools are rebuilt on the next run, e.g. after a provider key was rotated.
+if st.session_state.get("logged_in") and st.sidebar.button(
+        "모델·도구 초기화", help="모든 사용자가 공유하는 모델 연결, 이미지 분석 도구와 에이전트 구성을 다시 만듭니다. 실행 중인 작업에는 영향이 없습니다."):
+    from crews.crew import invalidate_resources
+
+    invalidate_resources()
+    st.toast("공유 모델과 도구를 초기화했습니다. 다음 실행에서 다시 준비됩니다.")
+
+# 작업 현황: 실행 중인 작업은 주기적으로 갱신되며, 새로고침 후에도 유지됩니다.
+job_panel(owner)
+
+# crewai, crewai_tools and chromadb load in the background once the page is drawn.
+warm_up(["crews.crew"])
@@ -0,0 +1,212 @@
+# batch.py
+"""
+Headless batch risk assessment.
+
+Usage:
+    python batch.py manifest.jsonl -o results.jsonl --workers 4
+
+The manifest is either JSONL (one object per line) or CSV with a header row.
+Each entry has an ``image`` path (or several photos of one work area, as a
+JSON list or one path per line of the CSV cell), an optional ``task`` string, an optional
+``model`` name, an optional ``mode`` ("hierarchical" or "sequential") and an
+optional ``id``. One JSONL record is appended to the output per entry. Entries
+already recorded without error are skipped, so rerunning the same command
+resumes a partially completed manifest.
+
+The agents and tools run on the models of ``--routing`` (see ``crews/routing.py``),
+and ``--route`` replaces single routes, e.g.
+``--route risk_reduction_expert=claude-3-5-sonnet-20240620``.
+"""
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from crews.routing import ROUTING_PROFILE, ROUTING_PROFILES, parse_route_overrides, resolve_routes
+from utils.images import join_images
+
+
+DEFAULT_TASK = "공종: 빔 거푸집 설치 작업, 공정: 자재 인양"
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_MODE = "hierarchical"
+
+
+def read_manifest(path: str, default_mode: str = DEFAULT_MODE) -> List[Dict[str, Any]]:
+    """
+    Reads a manifest file into a list of entries with stable ids.
+
+    Args:
+        path (str): Path to a `.jsonl` or `.csv` manifest.
+        default_mode (str): Execution mode of entries that do not set one.
+
+    Returns:
+        List[Dict[str, Any]]: Entries with `id`, `image`, `task`, `model` and `mode` keys.
+    """
+    with open(path, encoding="utf-8-sig") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    entries = []
+    for i, row in enumerate(rows, start=1):
+        entries.append({
+            "id": str(row.get("id") or i),
+            "image": join_images(row.get("image")),
+            "task": row.get("task") or DEFAULT_TASK,
+            "model": row.get("model") or DEFAULT_MODEL,
+            "mode": row.get("mode") or default_mode,
+        })
+    return entries
+
+
+def completed_ids(path: str) -> Set[str]:
+    """
+    Collects the ids that already have a successful record in the output file.
+
+    Args:
+        path (str): Path to the JSONL output.
+
+    Returns:
+        Set[str]: Ids to skip when resuming.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated last line from an interrupted run
+            if record.get("error") is None:
+                done.add(str(record.get("id")))
+    return done
+
+
+def _init_worker() -> None:
+    import master  # noqa: F401  (swap sqlite3 before chromadb is imported)
+
+
+def resolve_api_key(model_name: str) -> str:
+    import streamlit as st
+    from api.registry import get_api_name_from_model_name
+
+    env_key_name = get_api_name_from_model_name(model_name)
+    return os.getenv(env_key_name) or st.secrets["api_keys"].get(env_key_name)
+
+
+def assess(entry: Dict[str, Any], use_cache: bool = True, structured: bool = False,
+           routes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Runs one assessment in a worker process.
+
+    Args:
+        entry (Dict[str, Any]): A manifest entry.
+        use_cache (bool): Whether to answer repeated entries from the result cache.
+        structured (bool): Whether to run the crew in the structured-output mode.
+        routes (Optional[Dict[str, str]]): Model per agent and tool. Defaults to the configured routes.
+
+    Returns:
+        Dict[str, Any]: The JSONL record for the entry.
+    """
+    from api.models import get_company_name, get_model
+    from crews.crew import run_crew
+    from crews.schemas import extract_rows
+
+    record = {**entry, "rows": None, "raw": None, "error": None, "timings": {}}
+    started = time.perf_counter()
+    record["timings"]["started_at"] = time.time()
+    try:
+        model = get_model(entry["model"], api_key=resolve_api_key(entry["model"]))
+        routes = routes or resolve_routes()
+        api_keys = {get_company_name(model_name): resolve_api_key(model_name) for model_name in routes.values()}
+        result = run_crew(model, entry["image"], entry["task"], use_cache=use_cache, mode=entry["mode"],
+                          structured=structured, routes=routes, api_keys=api_keys)
+        record["raw"] = result.raw
+        record["timings"]["run_sec"] = round(time.perf_counter() - started, 3)
+
+        parse_started = time.perf_counter()
+        record["rows"] = extract_rows(result)
+        record["timings"]["parse_sec"] = round(time.perf_counter() - parse_started, 3)
+        if not record["rows"]:
+            record["error"] = "결과 형식이 올바르지 않습니다."
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["timings"]["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(entries: List[Dict[str, Any]], output: str, workers: int, use_cache: bool = True,
+              structured: bool = False, routes: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the entries on a process pool and appends each record to `output` as soon
+    as it completes.
+
+    Args:
+        entries (List[Dict[str, Any]]): Manifest entries still to run.
+        output (str): Path to the JSONL output.
+        workers (int): Number of worker processes.
+        use_cache (bool): Whether to answer repeated entries from the result cache.
+        structured (bool): Whether to run the crew in the structured-output mode.
+        routes (Optional[Dict[str, str]]): Model per agent and tool. Defaults to the configured routes.
+
+    Yields:
+        Dict[str, Any]: Each record, in completion order.
+    """
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"), initializer=_init_worker) as pool, \
+         open(output, "a", encoding="utf-8") as out:
+        futures = {pool.submit(assess, entry, use_cache, structured, routes): entry for entry in entries}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:  # Worker crashed before producing a record
+                record = {**futures[future], "rows": None, "raw": None, "error": f"{type(e).__name__}: {e}", "timings": {}}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            yield record
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run risk assessments for a manifest of site photos.")
+    parser.add_argument("manifest", help="Path to a .jsonl or .csv manifest.")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL output path (appended to).")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Number of worker processes.")
+    parser.add_argument("--mode", choices=["hierarchical", "sequential"], default=DEFAULT_MODE, help="Execution mode for entries that do not set one.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result cache and always run the crew.")
+    parser.add_argument("--structured", action="store_true", help="Have the crew return schema-validated tables instead of markdown.")
+    parser.add_argument("--no-resume", action="store_true", help="Rerun entries that already have a successful record.")
+    parser.add_argument("--routing", choices=list(ROUTING_PROFILES), default=ROUTING_PROFILE, help="Models of the agents and tools.")
+    parser.add_argument("--route", action="append", default=[], metavar="ROUTE=MODEL", help="Replace the model of one agent or tool (repeatable).")
+    args = parser.parse_args(argv)
+
+    try:
+        routes = resolve_routes(args.routing, parse_route_overrides(args.route))
+    except ValueError as e:
+        parser.error(str(e))
+
+    entries = read_manifest(args.manifest, args.mode)
+    if not args.no_resume:
+        done = completed_ids(args.output)
+        remaining = [entry for entry in entries if entry["id"] not in done]
+        if len(remaining) < len(entries):
+            print(f"Resuming: skipping {len(entries) - len(remaining)} completed entries.", file=sys.stderr)
+        entries = remaining
+
+    failures = 0
+    for i, record in enumerate(run_batch(entries, args.output, args.workers, use_cache=not args.no_cache,
+                                               structured=args.structured, routes=routes), start=1):
+        failures += record["error"] is not None
+        status = "ok" if record["error"] is None else f"error: {record['error']}"
+        print(f"[{i}/{len(entries)}] {record['id']} {status} ({record['timings'].get('elapsed_sec', '-')}s)", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# benchmarks/bench_modes.py
+"""
+Compares the hierarchical and sequential execution modes on the same inputs.
+
+Usage:
+    python -m benchmarks.bench_modes --image site.jpg --task "공종: ..., 공정: ..." --repeat 3
+
+Every run bypasses the result cache. Reports wall time, LLM call counts and token
+usage per mode, and writes the raw measurements as JSON with ``--output``.
+"""
+import master  # noqa: F401  (swap sqlite3 before chromadb is imported)
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+from typing import Any, Dict, List
+
+import litellm
+
+from api.models import get_model
+from batch import DEFAULT_MODEL, DEFAULT_TASK, resolve_api_key
+from crews.crew import EXECUTION_MODES, run_crew
+
+
+class LLMCallCounter:
+    """
+    Counts completed LLM requests through litellm's success callbacks. This also
+    covers the planner and manager calls, which `CrewOutput.token_usage` omits.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, kwargs, completion_response, start_time, end_time) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def __enter__(self) -> "LLMCallCounter":
+        litellm.success_callback.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        time.sleep(0.5)  # litellm dispatches success callbacks on a worker thread
+        litellm.success_callback.remove(self)
+
+
+def measure(model_name: str, image: str, task: str, mode: str) -> Dict[str, Any]:
+    model = get_model(model_name, api_key=resolve_api_key(model_name))
+    with LLMCallCounter() as counter:
+        started = time.perf_counter()
+        result = run_crew(model, image, task, use_cache=False, mode=mode,
+                          tools_api_key=resolve_api_key("gpt-4o"))
+        elapsed = time.perf_counter() - started
+    usage = result.token_usage
+    return {
+        "mode": mode,
+        "elapsed_sec": round(elapsed, 3),
+        "llm_calls": counter.calls,
+        "successful_requests": usage.successful_requests,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> None:
+    print(f"{'mode':<14}{'runs':>6}{'median s':>12}{'LLM calls':>12}{'tokens':>12}")
+    for mode in EXECUTION_MODES:
+        selected = [run for run in runs if run["mode"] == mode]
+        if not selected:
+            continue
+        print(f"{mode:<14}{len(selected):>6}"
+              f"{statistics.median(r['elapsed_sec'] for r in selected):>12.1f}"
+              f"{statistics.median(r['llm_calls'] for r in selected):>12.1f}"
+              f"{statistics.median(r['total_tokens'] for r in selected):>12.0f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark crew execution modes against a real provider.")
+    parser.add_argument("--image", default=None, help="Path to the site image.")
+    parser.add_argument("--task", default=DEFAULT_TASK, help="Task description.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Manager model name.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode.")
+    parser.add_argument("--output", default=None, help="Write the raw measurements to this JSON file.")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for _ in range(args.repeat):
+        for mode in EXECUTION_MODES:  # Interleave modes to spread provider latency drift
+            runs.append(measure(args.model, args.image, args.task, mode))
+            print(json.dumps(runs[-1]), file=sys.stderr)
+
+    summarize(runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# benchmarks/bench_pipeline.py
+"""
+Offline benchmark suite for the assessment pipeline.
+
+Usage:
+    python -m benchmarks.bench_pipeline                  # compare with the stored baseline
+    python -m benchmarks.bench_pipeline --save-baseline  # record a new baseline
+    python -m benchmarks.bench_pipeline --latency 0.05   # simulate provider latency
+
+All providers and tools are replaced by `benchmarks.stub`, so nothing leaves the
+machine. Each stage runs in a fresh spawned process so that peak RSS is attributed
+to that stage alone. Per stage the suite reports median wall and CPU time, traced
+peak memory, net change in allocated blocks and peak RSS. It exits with status 1 when a
+stage is slower than the baseline by more than ``--tolerance``.
+
+The committed ``baseline.json`` covers the stages that need no crew (logging,
+parsing and HTML rendering); stages without a baseline are reported without a
+comparison until ``--save-baseline`` records them. Timings are machine-specific,
+so record a baseline on the machine that runs the comparison.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+import tracemalloc
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAGES = [
+    "logger_setup",
+    "crew_construction",
+    "run_crew_sequential",
+    "run_crew_hierarchical",
+    "transform_to_json",
+    "transform_to_json_large",
+    "parse_stream_large",
+    "json_to_html_table",
+]
+
+
+def _stage_callable(stage: str, latency: float) -> Callable[[], Any]:
+    """
+    Prepares a stage in the current process and returns the callable to measure.
+    Everything outside the callable (imports, fixtures) is excluded from timings.
+    """
+    import master  # noqa: F401  (swap sqlite3 before chromadb is imported)
+
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")  # No crewai telemetry
+
+    from benchmarks.fixtures import REDUCTION_OUTPUT, synthetic_reduction_output
+    from utils.functions import json_to_html_table, transform_to_json_format_debug_fixed
+    from utils.logs import LoggerSetup
+    from utils.parsing import iter_risk_rows
+
+    if stage == "logger_setup":
+        counter = iter(range(1_000_000))
+
+        def run():
+            logger = LoggerSetup(f"bench.logger{next(counter) % 8}").logger
+            for i in range(100):
+                logger.debug(f"benchmark record {i}")
+        return run
+
+    if stage == "crew_construction":
+        from benchmarks.stub import StubLLM, stub_backend
+        from crews.crew import RiskAssessmentCrew
+        backend = stub_backend(latency)
+        backend.__enter__()  # Kept open for the lifetime of the stage process
+        return lambda: RiskAssessmentCrew(openai_api_key="stub").build(StubLLM(latency=latency), "sequential")
+
+    if stage.startswith("run_crew_"):
+        from benchmarks.stub import stub_backend
+        from crews.crew import run_crew
+        backend = stub_backend(latency)
+        stubs = backend.__enter__()
+        model = stubs["get_model"]("gpt-4o")
+        mode = stage[len("run_crew_"):]
+        return lambda: run_crew(model, None, "공종: 빔 거푸집 설치 작업, 공정: 자재 인양",
+                                use_cache=False, tools_api_key="stub", mode=mode)
+
+    if stage == "transform_to_json":
+        return lambda: transform_to_json_format_debug_fixed(REDUCTION_OUTPUT)
+
+    if stage == "transform_to_json_large":
+        large = synthetic_reduction_output(5_000)
+        return lambda: transform_to_json_format_debug_fixed(large)
+
+    if stage == "parse_stream_large":
+        large = synthetic_reduction_output(5_000)
+        chunks = [large[i:i + 64] for i in range(0, len(large), 64)]  # Token-sized pieces
+        return lambda: list(iter_risk_rows(chunks))
+
+    if stage == "json_to_html_table":
+        rows = transform_to_json_format_debug_fixed(synthetic_reduction_output(500))
+        return lambda: json_to_html_table(rows)
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def _measure_stage(stage: str, repeat: int, latency: float) -> Dict[str, Any]:
+    """Runs in a spawned child process."""
+    func = _stage_callable(stage, latency)
+    func()  # Warm-up (first pooled crew, regex caches, ...)
+
+    walls, cpus = [], []
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    # Allocation profile from a separate, traced run so tracing does not skew timings
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    net_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "stage": stage,
+        "repeat": repeat,
+        "wall_ms": round(statistics.median(walls) * 1000, 3),
+        "cpu_ms": round(statistics.median(cpus) * 1000, 3),
+        "traced_peak_kb": round(peak / 1024, 1),
+        "net_blocks": net_blocks,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_suite(stages: List[str], repeat: int, latency: float) -> List[Dict[str, Any]]:
+    ctx = mp.get_context("spawn")
+    results = []
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for stage in stages:
+            results.append(pool.apply(_measure_stage, (stage, repeat, latency)))
+            print(json.dumps(results[-1]), file=sys.stderr)
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> bool:
+    """
+    Prints the results next to the baseline.
+
+    Returns:
+        bool: True if any stage regressed beyond `tolerance` in wall or CPU time.
+    """
+    regressed = False
+    print(f"{'stage':<26}{'wall ms':>12}{'cpu ms':>12}{'peak KB':>12}{'net blk':>10}{'RSS MB':>10}{'vs base':>10}")
+    for result in results:
+        base = baseline.get(result["stage"])
+        ratio = ""
+        if base and base["wall_ms"] > 0:
+            wall_ratio = result["wall_ms"] / base["wall_ms"]
+            cpu_ratio = result["cpu_ms"] / base["cpu_ms"] if base["cpu_ms"] > 0 else 1.0
+            ratio = f"{wall_ratio:.2f}x"
+            if max(wall_ratio, cpu_ratio) > tolerance:
+                ratio += " !"
+                regressed = True
+        print(f"{result['stage']:<26}{result['wall_ms']:>12.3f}{result['cpu_ms']:>12.3f}"
+              f"{result['traced_peak_kb']:>12.1f}{result['net_blocks']:>10}{result['peak_rss_mb']:>10.1f}{ratio:>10}")
+    return regressed
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the risk assessment pipeline.")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Run only these stages (repeatable).")
+    parser.add_argument("--repeat", type=int, default=20, help="Measured repetitions per stage.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency per LLM call in seconds.")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown factor against the baseline.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.stage or STAGES, args.repeat, args.latency)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressed = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update({result["stage"]: result for result in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/bench_retrieval.py
+"""
+Compares the embedding backends of the regulation index on recall and latency.
+
+Usage:
+    python -m benchmarks.bench_retrieval                          # openai and local, top 5
+    python -m benchmarks.bench_retrieval --backend local --k 3 --output retrieval.json
+
+Each query names a phrase that only the relevant article contains; a query is a hit
+when one of the top-k chunks contains it. Indexes are built on first use, and the
+build time is reported separately from the query latency. The lexical BM25 index of
+`crews.lexical` is measured alongside as a network-free reference.
+"""
+import master  # noqa: F401  (swap sqlite3 before chromadb is imported)
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+from crews.lexical import get_lexical_index
+from crews.retrieval import is_index_built, load_regulation_app, regulation_index_key
+from crews.settings import EMBEDDING_BACKENDS
+
+
+# (query, phrase of the relevant article of 산업안전보건기준에 관한 규칙)
+QUERIES = [
+    ("자재 인양 중 물체가 떨어질 위험이 있을 때 필요한 조치", "낙하물 방지망"),
+    ("고소 작업에서 작업자가 떨어지지 않도록 하는 설비", "추락방호망"),
+    ("안전난간의 구조와 설치 요건", "상부 난간대"),
+    ("근로자에게 지급해야 하는 보호구", "안전대"),
+    ("크레인 작업 전에 작성해야 하는 계획서", "작업계획서"),
+    ("인양 작업 시 운전원과 신호수의 신호 방법", "신호방법"),
+    ("거푸집 동바리를 조립할 때 필요한 도면", "조립도"),
+    ("비계를 조립하거나 해체할 때의 준수 사항", "비계"),
+    ("위험한 장소에 관계 근로자 외 출입을 막는 조치", "출입금지"),
+    ("작업 발판의 폭과 틈", "작업발판"),
+]
+
+
+def measure(name: str, search: Callable[[str, int], List[str]], k: int) -> Dict[str, Any]:
+    latencies, hits = [], 0
+    for query, phrase in QUERIES:
+        started = time.perf_counter()
+        contexts = search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += any(phrase.replace(" ", "") in context.replace(" ", "") for context in contexts)
+    latencies.sort()
+    return {
+        "backend": name,
+        "queries": len(QUERIES),
+        f"recall@{k}": round(hits / len(QUERIES), 3),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare regulation retrieval backends.")
+    parser.add_argument("--backend", action="append", choices=EMBEDDING_BACKENDS, help="Backend to measure (repeatable). Defaults to all.")
+    parser.add_argument("--k", type=int, default=5, help="Chunks retrieved per query.")
+    parser.add_argument("--model", default=os.getenv("OPENAI_MODEL_NAME", "gpt-4o"), help="Retrieval LLM (unused by searches).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for backend in args.backend or EMBEDDING_BACKENDS:
+        if backend == "openai" and not os.getenv("OPENAI_API_KEY"):
+            print("Skipping openai: OPENAI_API_KEY is not set.", file=sys.stderr)
+            continue
+        built = is_index_built(regulation_index_key(backend=backend))
+        started = time.perf_counter()
+        app = load_regulation_app(os.getenv("OPENAI_API_KEY"), args.model, backend)
+        load_sec = time.perf_counter() - started
+
+        result = measure(backend, lambda query, k: [doc["context"] for doc in app.search(query, num_documents=k)], args.k)
+        result["build_sec" if not built else "load_sec"] = round(load_sec, 2)
+        results.append(result)
+
+    index = get_lexical_index()
+    results.append(measure("lexical", lambda query, k: [unit.text for _, unit in index.search(query, k)], args.k))
+
+    recall = f"recall@{args.k}"
+    print(f"{'backend':<10}{recall:>12}{'p50 ms':>10}{'p95 ms':>10}{'build/load s':>15}")
+    for result in results:
+        setup = result.get("build_sec", result.get("load_sec", "-"))
+        print(f"{result['backend']:<10}{result[recall]:>12.2f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{setup:>15}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
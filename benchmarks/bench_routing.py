@@ -0,0 +1,160 @@
+# benchmarks/bench_routing.py
+"""
+Compares model routing profiles on latency, token use, cost and output completeness.
+
+Usage:
+    python -m benchmarks.bench_routing --image site.jpg --repeat 3
+    python -m benchmarks.bench_routing --profile economy --profile configured --mode hierarchical --output routing.json
+
+Every run bypasses the result cache and checkpoints. Tokens are counted per model
+through litellm's success callbacks, so planner and manager calls are included, and
+priced with `PRICES`. A row of the result table is complete when it has a grade and
+measures, or "생략 가능" for an acceptable grade; completeness is the share of
+complete rows, reported next to the number of rows to catch dropped hazards.
+"""
+import master  # noqa: F401  (swap sqlite3 before chromadb is imported)
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import litellm
+
+from api.models import get_company_name, get_model
+from batch import DEFAULT_MODEL, DEFAULT_TASK, resolve_api_key
+from crews.crew import EXECUTION_MODES, run_crew
+from crews.routing import ROUTING_PROFILES, resolve_routes
+from crews.schemas import extract_rows
+from crews.scoring import ACCEPTABLE_GRADE, OMITTED
+
+
+# USD per million (prompt, completion) tokens, list prices at the time of writing
+PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-3-5-sonnet-20240620": (3.00, 15.00),
+    "claude-3-opus-20240229": (15.00, 75.00),
+    "claude-3-sonnet-20240229": (3.00, 15.00),
+}
+
+
+class ModelUsage:
+    """
+    Sums the tokens of completed LLM requests per model through litellm's success callbacks.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.prompt_tokens: Dict[str, int] = defaultdict(int)
+        self.completion_tokens: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, kwargs, completion_response, start_time, end_time) -> None:
+        model_name = kwargs.get("model", "unknown")
+        usage = getattr(completion_response, "usage", None)
+        with self._lock:
+            self.calls[model_name] += 1
+            self.prompt_tokens[model_name] += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens[model_name] += getattr(usage, "completion_tokens", 0) or 0
+
+    def cost(self) -> float:
+        total = 0.0
+        for model_name, (prompt_price, completion_price) in PRICES.items():
+            total += (self.prompt_tokens.get(model_name, 0) * prompt_price
+                      + self.completion_tokens.get(model_name, 0) * completion_price) / 1_000_000
+        return total
+
+    def __enter__(self) -> "ModelUsage":
+        litellm.success_callback.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        time.sleep(0.5)  # litellm dispatches success callbacks on a worker thread
+        litellm.success_callback.remove(self)
+
+
+def _is_complete(row: Dict[str, Any]) -> bool:
+    grade = str(row.get("위험 등급", "")).strip()
+    measures = row.get("위험 저감 대책")
+    if isinstance(measures, list):
+        measures = "\n".join(str(measure) for measure in measures)
+    measures = str(measures or "").strip()
+    if not grade.isdigit() or not measures:
+        return False
+    return int(grade) <= ACCEPTABLE_GRADE or OMITTED not in measures
+
+
+def measure(profile: str, model_name: str, image: str, task: str, mode: str) -> Dict[str, Any]:
+    routes = resolve_routes(profile)
+    api_keys = {get_company_name(name): resolve_api_key(name) for name in routes.values()}
+    model = get_model(model_name, api_key=resolve_api_key(model_name))
+    with ModelUsage() as usage:
+        started = time.perf_counter()
+        result = run_crew(model, image, task, use_cache=False, mode=mode,
+                          tools_api_key=resolve_api_key("gpt-4o"), routes=routes, api_keys=api_keys)
+        elapsed = time.perf_counter() - started
+
+    rows = extract_rows(result)
+    complete = sum(_is_complete(row) for row in rows)
+    return {
+        "profile": profile,
+        "mode": mode,
+        "routes": routes,
+        "elapsed_sec": round(elapsed, 3),
+        "llm_calls": sum(usage.calls.values()),
+        "tokens_by_model": {
+            name: usage.prompt_tokens[name] + usage.completion_tokens[name] for name in usage.calls
+        },
+        "total_tokens": sum(usage.prompt_tokens.values()) + sum(usage.completion_tokens.values()),
+        "cost_usd": round(usage.cost(), 5),
+        "rows": len(rows),
+        "completeness": round(complete / len(rows), 3) if rows else 0.0,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]], profiles: List[str]) -> None:
+    print(f"{'profile':<12}{'runs':>6}{'median s':>10}{'tokens':>10}{'cost $':>10}{'rows':>7}{'complete':>10}")
+    for profile in profiles:
+        selected = [run for run in runs if run["profile"] == profile]
+        if not selected:
+            continue
+        print(f"{profile:<12}{len(selected):>6}"
+              f"{statistics.median(r['elapsed_sec'] for r in selected):>10.1f}"
+              f"{statistics.median(r['total_tokens'] for r in selected):>10.0f}"
+              f"{statistics.median(r['cost_usd'] for r in selected):>10.4f}"
+              f"{statistics.median(r['rows'] for r in selected):>7.1f}"
+              f"{statistics.mean(r['completeness'] for r in selected):>10.2f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark model routing profiles against real providers.")
+    parser.add_argument("--image", default=None, help="Path to the site image.")
+    parser.add_argument("--task", default=DEFAULT_TASK, help="Task description.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Manager model name.")
+    parser.add_argument("--mode", choices=EXECUTION_MODES, default="sequential", help="Execution mode of every run.")
+    parser.add_argument("--profile", action="append", choices=list(ROUTING_PROFILES), help="Profile to measure (repeatable). Defaults to all.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per profile.")
+    parser.add_argument("--output", default=None, help="Write the raw measurements to this JSON file.")
+    args = parser.parse_args(argv)
+
+    profiles = args.profile or list(ROUTING_PROFILES)
+    runs = []
+    for _ in range(args.repeat):
+        for profile in profiles:  # Interleave profiles to spread provider latency drift
+            runs.append(measure(profile, args.model, args.image, args.task, args.mode))
+            print(json.dumps(runs[-1], ensure_ascii=False), file=sys.stderr)
+
+    summarize(runs, profiles)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(runs, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
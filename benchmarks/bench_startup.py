@@ -0,0 +1,140 @@
+# benchmarks/bench_startup.py
+"""
+Startup-time report for the Streamlit app.
+
+Usage:
+    python -m benchmarks.bench_startup                       # imports of app.py, 5 cold starts
+    python -m benchmarks.bench_startup --module crews.crew   # also what the first assessment loads
+    python -m benchmarks.bench_startup --save-baseline
+
+Runs the module-level imports of ``app.py`` in fresh interpreters with
+``-X importtime`` and reports the median wall time, plus a per-package breakdown
+of the slowest imports. The import statements are read from ``app.py`` itself,
+so the report follows the app as it changes. ``api.registry`` reads
+``st.secrets`` at import time, so ``.streamlit/secrets.toml`` must exist.
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Any, Dict, List
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+BASELINE_KEY = "startup_imports"
+
+
+def app_imports(path: str = APP_PATH) -> List[str]:
+    """
+    Returns the module-level import statements of the app, in order.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def cold_start(statements: List[str]) -> Dict[str, Any]:
+    """
+    Executes the statements in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        Dict[str, Any]: `wall_ms` and the parsed `imports` as (depth, name, self_us, cumulative_us).
+    """
+    code = "\n".join(["import time", "_started = time.perf_counter()", *statements,
+                      "print((time.perf_counter() - _started) * 1000)"])
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "startup failed")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((
+            (len(name) - len(name.lstrip()) - 1) // 2,
+            name.strip(),
+            int(self_us),
+            int(cumulative_us),
+        ))
+    return {"wall_ms": float(proc.stdout.strip().splitlines()[-1]), "imports": imports}
+
+
+def breakdown(imports: List[tuple], top: int) -> List[Dict[str, Any]]:
+    """
+    Aggregates the import times per top-level package.
+
+    Returns:
+        List[Dict[str, Any]]: The `top` slowest packages by cumulative time.
+    """
+    packages = defaultdict(lambda: {"cumulative_ms": 0.0, "self_ms": 0.0, "modules": 0})
+    for depth, name, self_us, cumulative_us in imports:
+        package = packages[name.split(".")[0]]
+        package["self_ms"] += self_us / 1000
+        package["modules"] += 1
+        if depth == 0:
+            package["cumulative_ms"] += cumulative_us / 1000
+    rows = [{"package": name, **{k: round(v, 1) if isinstance(v, float) else v for k, v in stats.items()}}
+            for name, stats in packages.items()]
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the import-time startup cost of app.py.")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts to measure.")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown in the breakdown.")
+    parser.add_argument("--module", action="append", default=[], help="Extra module to import after the app's imports (repeatable).")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown factor against the baseline.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this result as the new baseline.")
+    parser.add_argument("--output", default=None, help="Write the full report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    statements = app_imports() + [f"import {module}" for module in args.module]
+    runs = [cold_start(statements) for _ in range(args.repeat)]
+    median_run = sorted(runs, key=lambda run: run["wall_ms"])[len(runs) // 2]
+    report = {
+        "stage": BASELINE_KEY,
+        "repeat": args.repeat,
+        "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1),
+        "modules": len(median_run["imports"]),
+        "breakdown": breakdown(median_run["imports"], args.top),
+    }
+
+    print(f"Startup imports: {report['wall_ms']:.1f} ms median over {args.repeat} cold starts, {report['modules']} modules")
+    print(f"{'package':<28}{'cumulative ms':>16}{'self ms':>12}{'modules':>10}")
+    for row in report["breakdown"]:
+        print(f"{row['package']:<28}{row['cumulative_ms']:>16.1f}{row['self_ms']:>12.1f}{row['modules']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        baseline[BASELINE_KEY] = {"stage": BASELINE_KEY, "repeat": args.repeat, "wall_ms": report["wall_ms"]}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    base = baseline.get(BASELINE_KEY)
+    if base and base["wall_ms"] > 0:
+        ratio = report["wall_ms"] / base["wall_ms"]
+        print(f"vs baseline: {ratio:.2f}x ({base['wall_ms']:.1f} ms)")
+        return 1 if ratio > args.tolerance else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
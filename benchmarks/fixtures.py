@@ -0,0 +1,66 @@
+# benchmarks/fixtures.py
+"""
+Canned Korean outputs in the format requested by `crews/config/tasks.yaml`.
+
+Kept apart from `benchmarks.stub` so that the pure stages (parsing, HTML rendering)
+can be measured without crewai installed.
+"""
+
+
+DETECTION_OUTPUT = """1. **위험 요인**: 인양 중인 거푸집 자재의 낙하
+   - **위험 시나리오**: 크레인으로 빔 거푸집 자재를 인양하던 중 결속이 풀려 하부 작업자에게 자재가 낙하합니다.
+   - **결과**: 하부 작업자의 두부 손상 또는 사망.
+2. **위험 요인**: 고소 작업 중 작업자 추락
+   - **위험 시나리오**: 안전 난간이 설치되지 않은 빔 상부에서 거푸집을 설치하던 작업자가 균형을 잃고 추락합니다.
+   - **결과**: 골절, 장기 장애 또는 사망.
+3. **위험 요인**: 인양 장비 신호 불일치로 인한 충돌
+   - **위험 시나리오**: 신호수와 운전원의 신호가 맞지 않아 인양물이 가설 구조물에 충돌합니다.
+   - **결과**: 구조물 손상 및 작업 지연."""
+
+ASSESSMENT_OUTPUT = """| 위험 요인 | 심각도(S) | 빈도(F) | 위험 등급 | 위험 수준 |
+|---|---|---|---|---|
+| 인양 중인 거푸집 자재의 낙하 | 4 | 3 | 12 | 용납 불가 |
+| 고소 작업 중 작업자 추락 | 4 | 2 | 8 | 용납 불가 |
+| 인양 장비 신호 불일치로 인한 충돌 | 2 | 1 | 2 | 용납 가능 |
+
+- 인양 중인 거푸집 자재의 낙하: 낙하물에 의한 사망 가능성이 있어 심각도 4, 최근 1년간 유사 사고가 보고되어 빈도 3으로 평가했습니다.
+- 고소 작업 중 작업자 추락: 추락 시 사망 가능성이 있어 심각도 4, 최근 3년간 유사 사고 기록이 있어 빈도 2로 평가했습니다.
+- 인양 장비 신호 불일치로 인한 충돌: 경미한 물적 손상에 그쳐 심각도 2, 유사 사고 기록이 없어 빈도 1로 평가했습니다."""
+
+REDUCTION_OUTPUT = """1. **위험 요인**: 인양 중인 거푸집 자재의 낙하
+  - **위험 등급**: 12
+  - **위험 저감 대책**:
+    - 인양 전 줄걸이 용구와 결속 상태를 점검하고 2점 이상 결속합니다.
+    - 인양 반경 내 작업자 출입을 통제하고 유도 로프를 사용합니다.
+    - 신호수를 지정하여 인양 작업 전 과정을 통제합니다.
+
+2. **위험 요인**: 고소 작업 중 작업자 추락
+  - **위험 등급**: 8
+  - **위험 저감 대책**:
+    - 빔 상부 작업 구간에 안전 난간과 추락 방호망을 설치합니다.
+    - 작업자에게 안전대를 지급하고 부착 설비를 확보합니다.
+
+3. **위험 요인**: 인양 장비 신호 불일치로 인한 충돌
+  - **위험 등급**: 2
+  - **위험 저감 대책**: 생략 가능"""
+
+REGULATION_SNIPPET = "산업안전보건기준에 관한 규칙 제14조(낙하물에 의한 위험의 방지) 사업주는 작업장의 바닥, 도로 및 통로 등에서 낙하물이 근로자에게 위험을 미칠 우려가 있는 경우 보호망을 설치하는 등 필요한 조치를 하여야 한다."
+
+VISION_OUTPUT = "크레인으로 빔 거푸집 자재를 인양하는 건설 현장입니다. 빔 상부에 안전 난간이 없고 하부에 작업자 2명이 있습니다."
+
+
+def synthetic_reduction_output(rows: int) -> str:
+    """
+    Repeats the canned `risk_reduction` entries to build an output with `rows` rows.
+
+    Args:
+        rows (int): Number of entries to generate.
+
+    Returns:
+        str: Text in the `risk_reduction` output format.
+    """
+    entries = REDUCTION_OUTPUT.split("\n\n")
+    return "\n\n".join(
+        entries[i % len(entries)].replace(f"{i % len(entries) + 1}. ", f"{i + 1}. ", 1)
+        for i in range(rows)
+    )
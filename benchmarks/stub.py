@@ -0,0 +1,142 @@
+# benchmarks/stub.py
+"""
+A deterministic, offline stand-in for the LLM providers and crew tools.
+
+`stub_backend` swaps `get_model`, the agents' LLM and the vision/PDF tools for
+local stubs that sleep for a configurable latency and replay canned Korean
+outputs in the format requested by `crews/config/tasks.yaml`.
+"""
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Type
+from unittest import mock
+
+from crewai import LLM
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from benchmarks.fixtures import ASSESSMENT_OUTPUT, DETECTION_OUTPUT, REDUCTION_OUTPUT, REGULATION_SNIPPET, VISION_OUTPUT
+
+
+# Distinctive phrases of each prompt, checked in order. The planner prompt embeds
+# every task description, so it has to be recognized first.
+_ROUTES = [
+    ("Task Execution Planner", "planner"),
+    ("구체적인 위험 저감 대책을 제안해야 합니다", "risk_reduction"),
+    ("세부 기준에 따라 1에서 4까지의 점수로 평가됩니다", "risk_assessment"),
+    ("잠재적 위험을 식별하고 나열합니다", "integrated_risk_detection"),
+]
+
+CANNED_OUTPUTS = {
+    "integrated_risk_detection": DETECTION_OUTPUT,
+    "risk_assessment": ASSESSMENT_OUTPUT,
+    "risk_reduction": REDUCTION_OUTPUT,
+    "planner": json.dumps({
+        "list_of_plans_per_task": [
+            {"task": name, "plan": f"{name} 작업을 지시에 따라 수행합니다."}
+            for name in ("integrated_risk_detection", "risk_assessment", "risk_reduction")
+        ]
+    }, ensure_ascii=False),
+}
+
+
+class StubLLM(LLM):
+    """
+    An LLM that answers from `CANNED_OUTPUTS` after sleeping for `latency` seconds.
+
+    Attributes:
+        latency (float): Simulated response time in seconds.
+        calls (int): Number of calls answered so far.
+    """
+
+    def __init__(self, model: str = "stub", latency: float = 0.0, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.latency = latency
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = "\n".join(str(m.get("content", "")) for m in messages) if isinstance(messages, list) else str(messages)
+        route = next((name for phrase, name in _ROUTES if phrase in prompt), "risk_reduction")
+        return f"Thought: I now know the final answer\nFinal Answer: {CANNED_OUTPUTS[route]}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+
+class _QuerySchema(BaseModel):
+    query: str = Field(..., description="Query to search the document.")
+
+
+class _ImageSchema(BaseModel):
+    image_path_url: str = Field(..., description="The image path or URL.")
+
+
+class StubSearchTool(BaseTool):
+    name: str = "Search a PDF's content"
+    description: str = "Returns a canned regulation excerpt."
+    args_schema: Type[BaseModel] = _QuerySchema
+
+    def _run(self, query: str, **kwargs) -> str:
+        return REGULATION_SNIPPET
+
+
+class StubVisionTool(BaseTool):
+    name: str = "Vision Tool"
+    description: str = "Returns a canned site description."
+    args_schema: Type[BaseModel] = _ImageSchema
+    model: str = "stub"
+    api_key: Optional[str] = None
+
+    def _run(self, image_path_url: str, **kwargs) -> str:
+        return VISION_OUTPUT
+
+
+@contextmanager
+def stub_backend(latency: float = 0.0) -> Iterator[Dict[str, Any]]:
+    """
+    Routes every LLM, vision and retrieval call of the crew to local stubs, and
+    points the result cache at a throwaway directory.
+
+    Args:
+        latency (float): Simulated latency of each LLM call in seconds.
+
+    Yields:
+        Dict[str, Any]: `get_model`, a factory returning `StubLLM` instances, and
+        `llms`, every stub LLM created so far (for call counts).
+    """
+    import api.models
+    import crews.checkpoints
+    import crews.crew
+    from crews.cache import ResultCache
+
+    llms: List[StubLLM] = []
+
+    def make_llm(model: str = "stub", **kwargs) -> StubLLM:
+        llm = StubLLM(model=f"stub/{model}", latency=latency)
+        llms.append(llm)
+        return llm
+
+    with mock.patch.object(api.models, "get_model", make_llm), \
+         mock.patch.object(crews.crew, "LLM", make_llm), \
+         mock.patch.object(crews.crew, "get_site_vision_tool", lambda api_key, model: StubVisionTool()), \
+         mock.patch.object(crews.crew, "get_regulation_search_tools", lambda api_key, model: [StubSearchTool()]), \
+         mock.patch.object(crews.crew, "get_regulation_lookup_tool", lambda: StubSearchTool(name="Regulation Lookup Tool")), \
+         tempfile.TemporaryDirectory() as cache_dir, \
+         mock.patch.object(crews.crew, "result_cache", ResultCache(directory=cache_dir)), \
+         mock.patch.object(crews.checkpoints, "checkpoint_store", ResultCache(directory=f"{cache_dir}/checkpoints")):
+        crews.crew.crew_pool.clear()
+        try:
+            yield {"get_model": make_llm, "llms": llms}
+        finally:
+            crews.crew.crew_pool.clear()
@@ -0,0 +1,394 @@
+# crews/cache.py
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.functions import file_digest
+from utils.images import image_ref_digest, is_image_ref, split_images
+from utils.logs import LoggerSetup
+from utils.metrics import registry
+from utils.phash import canonical_image_digest, index_image
+
+
+logger = LoggerSetup("crews.cache").logger
+
+CONFIG_DIR = Path(__file__).parent / "config"
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "cache/results")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1_024 * 1_024)))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 60 * 60)))
+# Seconds after which the directory is rescanned to account for entries written by other processes
+RESULT_CACHE_RESCAN_INTERVAL = float(os.getenv("RESULT_CACHE_RESCAN_INTERVAL", "300"))
+
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "2048"))
+RETRIEVAL_CACHE_PATH = os.getenv("RETRIEVAL_CACHE_PATH", "cache/retrieval.jsonl")  # Empty: memory only
+
+
+def normalize_task(text: str) -> str:
+    """
+    Normalizes a task description so that trivially different inputs share a key.
+
+    Args:
+        text (str): The task description entered by the user.
+
+    Returns:
+        str: NFC-normalized text with collapsed whitespace.
+    """
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalizes a retrieval query: `normalize_task`, lower-cased, without trailing punctuation.
+
+    Args:
+        text (str): The query written by an agent.
+
+    Returns:
+        str: The normalized query.
+    """
+    return normalize_task(text).lower().rstrip(" ?.!")
+
+
+def config_digest() -> str:
+    """
+    Hashes the crew configuration YAML files, so that prompt changes invalidate
+    previously cached results.
+
+    Returns:
+        str: The hex digest over `agents.yaml` and `tasks.yaml`.
+    """
+    return hashlib.sha256(
+        "".join(file_digest(str(CONFIG_DIR / name)) for name in ("agents.yaml", "tasks.yaml")).encode()
+    ).hexdigest()
+
+
+def _content_digest(image: str) -> str:
+    # References carry the hash of the original upload, matching `file_digest` of the same file.
+    return image_ref_digest(image) if is_image_ref(image) else file_digest(image)
+
+
+def image_digest(image: Optional[str], canonical: bool = False) -> str:
+    """
+    Hashes the content of one or more images.
+
+    Args:
+        image (Optional[str]): An image, or several joined with `join_images`.
+        canonical (bool): Substitute the digest of an indexed near-duplicate for each
+            photo (see `utils.phash`). Only for keys of vision and detection outputs.
+
+    Returns:
+        str: A hex digest, or "none" without images.
+    """
+    images = split_images(image)
+    if not images:
+        return "none"
+    digests = [_content_digest(part) for part in images]
+    if canonical:
+        digests = [canonical_image_digest(part, digest) for part, digest in zip(images, digests)]
+    if len(digests) == 1:
+        return digests[0]
+    # The same photos in any order describe the same work area.
+    return hashlib.sha256("".join(sorted(digests)).encode()).hexdigest()
+
+
+def index_images(image: Optional[str]) -> None:
+    """
+    Adds the photos of a successful run to the perceptual-hash index, so that later
+    near-duplicates reuse their vision and detection outputs.
+    """
+    for part in split_images(image):
+        try:
+            index_image(part, _content_digest(part))
+        except (OSError, KeyError) as e:  # File removed or reference released meanwhile
+            logger.warning(f"Could not index {part[:40]}: {e}")
+
+
+class ResultCache:
+    """
+    An on-disk, content-addressed cache of complete risk assessments.
+
+    Each entry is a JSON file named after its key. Reads refresh the file's
+    mtime, which serves as the LRU clock. Entries older than `ttl` seconds, and
+    the least recently used entries beyond the size limits, are evicted on write.
+    The entries and their total size are tracked in memory; the directory is only
+    scanned on first use and every `RESULT_CACHE_RESCAN_INTERVAL` seconds, to pick
+    up the writes of other processes such as batch workers.
+
+    Entries are scoped by the `scope` of `key`, i.e. the API key that paid for
+    them: callers using the same API key share results, others do not.
+
+    Attributes:
+        directory (str): Where entries are stored.
+        max_entries (int): Maximum number of entries kept.
+        max_bytes (int): Maximum total size of the entries in bytes.
+        ttl (float): Maximum age of an entry in seconds.
+    """
+
+    def __init__(self,
+                 directory: str = RESULT_CACHE_DIR,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl: float = RESULT_CACHE_TTL):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()  # Path -> (last use, size), LRU first
+        self._bytes = 0
+        self._scanned_at: Optional[float] = None
+
+    def key(self, image: Optional[str], task: str, model_name: str, mode: str = "hierarchical",
+            structured: bool = False, routes: Optional[str] = None, scope: Optional[str] = None) -> str:
+        """
+        Builds the cache key of an assessment.
+
+        Args:
+            image (Optional[str]): Path to the site image, if any.
+            task (str): The task description.
+            model_name (str): The name of the managing model.
+            mode (str): The crew execution mode.
+            structured (bool): Whether the structured-output mode was used.
+            routes (Optional[str]): The agent and tool models, see `crews.routing.routes_signature`.
+            scope (Optional[str]): Digest of the API key the result is generated with. Entries
+                are only shared between callers with the same scope.
+
+        Returns:
+            str: A hex digest over the image content, normalized task, model, mode, output mode,
+            routed models, scope and crew config.
+        """
+        parts = [image_digest(image), normalize_task(task), model_name, mode, config_digest()]
+        if structured:
+            parts.append("structured")  # Keeps the keys of free-form results unchanged
+        if routes:
+            parts.append(routes)
+        if scope:
+            parts.append(scope)
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up an entry.
+
+        Args:
+            key (str): The key returned by `key`.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored entry, or None on a miss or an expired entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            with self._lock:
+                self._forget(path)
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            if path in self._entries:
+                self._entries[path] = (time.time(), self._entries[path][1])
+                self._entries.move_to_end(path)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Stores an entry atomically and enforces the size and age limits.
+
+        Args:
+            key (str): The key returned by `key`.
+            entry (Dict[str, Any]): JSON-serializable data to store.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {**entry, "created_at": time.time()}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        size = os.path.getsize(tmp)
+        path = self._path(key)
+        os.replace(tmp, path)
+        with self._lock:
+            self._forget(path)
+            self._entries[path] = (time.time(), size)
+            self._bytes += size
+            self._evict()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _forget(self, path: str) -> None:
+        # Called with the lock held
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+
+    def _scan(self) -> None:
+        # Called with the lock held
+        entries = []
+        for item in os.scandir(self.directory):
+            if item.name.endswith(".json"):
+                stat = item.stat()
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        entries.sort()  # Least recently used first
+        self._entries = OrderedDict((path, (mtime, size)) for mtime, size, path in entries)
+        self._bytes = sum(size for _, size, _ in entries)
+        self._scanned_at = time.monotonic()
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        if self._scanned_at is None or time.monotonic() - self._scanned_at > RESULT_CACHE_RESCAN_INTERVAL:
+            self._scan()
+        deadline = time.time() - self.ttl
+        while self._entries:
+            path, (last_used, _) = next(iter(self._entries.items()))
+            if last_used >= deadline and len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            self._forget(path)
+            self._remove(path)
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if os.path.isdir(self.directory):
+            for item in os.scandir(self.directory):
+                if item.name.endswith(".json"):
+                    self._remove(item.path)
+
+
+result_cache = ResultCache()
+
+
+class QueryCache:
+    """
+    An in-memory LRU cache of regulation search results, shared by every agent and run
+    in the process. A hit skips both the query embedding and the vector search.
+
+    With `path`, entries are also appended to a JSON Lines file and reloaded on start,
+    so that results survive restarts. The file is compacted to the live entries once
+    it holds twice as many lines.
+
+    Attributes:
+        max_entries (int): Maximum number of entries kept in memory.
+        path (Optional[str]): The persistence file, or None for a memory-only cache.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES, path: Optional[str] = RETRIEVAL_CACHE_PATH or None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, source: str, query: str) -> str:
+        """
+        Builds the cache key of a query.
+
+        Args:
+            source (str): Identifies what is searched: the index, the PDF content hash and the top-k.
+            query (str): The query text.
+
+        Returns:
+            str: A hex digest over the source and the normalized query.
+        """
+        return hashlib.sha256(f"{source}\x1f{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        registry.inc("retrieval_cache_requests_total", result="miss" if result is None else "hit")
+        return result
+
+    def put(self, key: str, result: str) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._append(key, result)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line cut short by a crash
+                self._entries[entry["key"]] = entry["result"]
+                self._entries.move_to_end(entry["key"])
+                self._lines += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.debug(f"Loaded {len(self._entries)} retrieval cache entries from {self.path}.")
+
+    def _append(self, key: str, result: str) -> None:
+        # Called with the lock held
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if self._lines >= 2 * self.max_entries:
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for k, v in self._entries.items():
+                        f.write(json.dumps({"key": k, "result": v}, ensure_ascii=False) + "\n")
+                os.replace(tmp, self.path)
+                self._lines = len(self._entries)
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+                self._lines += 1
+        except OSError as e:
+            logger.warning(f"Failed to persist the retrieval cache: {e}")
+
+    def clear(self) -> None:
+        """
+        Removes every entry, including the persisted ones.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._lines = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+retrieval_cache = QueryCache()
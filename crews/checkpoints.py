@@ -0,0 +1,199 @@
+# crews/checkpoints.py
+"""
+Stage-level checkpoints for sequential runs.
+
+Each task output is stored under a key over exactly what the task sees: the run
+inputs its prompt interpolates, the upstream output, its own agent and task
+configuration, the agent model (and, for detection, the vision tool's model) and
+the output schema. A rerun restores every stage whose key is unchanged and executes
+the pipeline from the first stage that differs, so editing the reduction prompt or
+retrying a failed run costs only the stages after the change.
+
+Only sequential runs are resumable: in a hierarchical run the manager decides which
+agent works on what, so there are no fixed stages to key. Those runs are cached
+as a whole by `crews.cache.ResultCache` only.
+"""
+import os
+import json
+import hashlib
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+from crews.cache import CONFIG_DIR, ResultCache, image_digest, normalize_task
+from crews.routing import VISION_ROUTE
+from crews.schemas import extract_rows
+from crews.scoring import Hazard, score_tables
+from utils.logs import LoggerSetup
+from utils.metrics import registry
+
+
+logger = LoggerSetup("crews.checkpoints").logger
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "cache/checkpoints")
+CHECKPOINT_MAX_ENTRIES = int(os.getenv("CHECKPOINT_MAX_ENTRIES", "4096"))
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", str(7 * 24 * 60 * 60)))
+
+# (task, agent) of `RiskAssessmentCrew`, in execution order
+STAGES = [
+    ("integrated_risk_detection", "integrated_risk_detector"),
+    ("risk_assessment", "risk_assessment_expert"),
+    ("risk_reduction", "risk_reduction_expert"),
+]
+
+checkpoint_store = ResultCache(directory=CHECKPOINT_DIR, max_entries=CHECKPOINT_MAX_ENTRIES, ttl=CHECKPOINT_TTL)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stage_configs() -> Dict[str, Dict[str, Any]]:
+    """
+    Reads the YAML configuration of every stage. The crew's own `tasks_config` cannot be
+    used: CrewBase replaces the agent names in it with agent instances.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The "task" and "agent" configuration per task name.
+    """
+    import yaml
+
+    with open(CONFIG_DIR / "tasks.yaml", encoding="utf-8") as f:
+        tasks = yaml.safe_load(f)
+    with open(CONFIG_DIR / "agents.yaml", encoding="utf-8") as f:
+        agents = yaml.safe_load(f)
+    return {task: {"task": tasks[task], "agent": agents[agent]} for task, agent in STAGES}
+
+
+def stage_key(stage: str, config: Dict[str, Any], inputs: Dict[str, str], upstream: Optional[str],
+              model_name: str, schema: Optional[str] = None, tool_model: Optional[str] = None) -> str:
+    """
+    Builds the checkpoint key of a stage.
+
+    Args:
+        stage (str): The task name, one of `STAGES`.
+        config (Dict[str, Any]): The task's and its agent's YAML configuration.
+        inputs (Dict[str, str]): The run inputs, already normalized. Only those the
+            configuration interpolates are part of the key.
+        upstream (Optional[str]): The raw output of the previous stage, None for the first.
+        model_name (str): The model of the stage's agent.
+        schema (Optional[str]): Name of the task's output schema in structured mode.
+        tool_model (Optional[str]): The model of a tool whose output the stage depends on,
+            i.e. the vision model of the detection stage.
+
+    Returns:
+        str: A hex digest over the stage's inputs.
+    """
+    config_text = json.dumps(config, ensure_ascii=False, sort_keys=True)
+    used = {name: value for name, value in inputs.items() if f"{{{name}}}" in config_text}
+    parts = [stage, _digest(config_text), json.dumps(used, ensure_ascii=False, sort_keys=True),
+             _digest(upstream) if upstream is not None else "none", model_name, schema or "text"]
+    if tool_model:
+        parts.append(tool_model)
+    return _digest("\x1f".join(parts))
+
+
+def _restore(task: Task, entry: Dict[str, Any]) -> TaskOutput:
+    output = TaskOutput.model_validate(entry["output"])
+    if task.output_pydantic is not None and entry["output"].get("pydantic"):
+        # `TaskOutput.pydantic` is typed as a bare BaseModel and loses its fields on validation.
+        output.pydantic = task.output_pydantic.model_validate(entry["output"]["pydantic"])
+    return output
+
+
+def _is_complete(stage: str, output: TaskOutput) -> bool:
+    # A reduction table that cannot be parsed must be regenerated, not restored.
+    if stage != "risk_reduction":
+        return True
+    try:
+        return bool(extract_rows(output))
+    except Exception:
+        return False
+
+
+def run_stages(crew_base, image: Optional[str], tasks: str, use_checkpoints: bool = True) -> CrewOutput:
+    """
+    Runs the tasks of a built sequential crew one by one, restoring checkpointed stages.
+
+    Performs the task and agent preparation of `Crew.kickoff`, then executes each task
+    with `Task.execute_sync`, handing it the previous output as context, as the
+    sequential process does. Restored outputs are passed to the crew's task callback
+    like executed ones.
+
+    Args:
+        crew_base (RiskAssessmentCrew): The instance whose `built_crew` is sequential.
+        image (Optional[str]): Path or identifier of the construction site image.
+        tasks (str): The task description.
+        use_checkpoints (bool): Set to False to execute every stage. Outputs are still stored.
+
+    Returns:
+        CrewOutput: The output of the last stage, with every stage in `tasks_output`.
+
+    Raises:
+        ValueError: If the crew is hierarchical, which cannot be resumed stage by stage.
+    """
+    crew: Crew = crew_base.built_crew
+    if crew.process != Process.sequential:
+        raise ValueError("Only sequential crews can be resumed from checkpoints; kick off hierarchical crews instead.")
+
+    # Mirrors `Crew.kickoff` of crewai==0.80.0 (pinned in requirements.txt) through its
+    # private `_interpolate_inputs`, `_set_tasks_callbacks` and `create_agent_executor`.
+    # Recheck this preparation whenever crewai is upgraded.
+    inputs = {"image": image, "tasks": tasks}
+    crew._interpolate_inputs(inputs)
+    crew._set_tasks_callbacks()  # Executed tasks report to `crew.task_callback` as in a kickoff
+    for agent in crew.agents:
+        agent.crew = crew
+        if not agent.step_callback and crew.step_callback:
+            agent.step_callback = crew.step_callback
+        agent.create_agent_executor()
+
+    configs = stage_configs()
+    key_inputs = {"image": image_digest(image), "tasks": normalize_task(tasks)}
+    # Detection may reuse the output of a near-duplicate photo (see `utils.phash`). Later
+    # stages are keyed by their own inputs, so they are restored only for identical ones.
+    detection_inputs = {**key_inputs, "image": image_digest(image, canonical=True)}
+    outputs: List[TaskOutput] = []
+    for (stage, _), task in zip(STAGES, crew.tasks):
+        model_name = getattr(task.agent.llm, "model", str(task.agent.llm))
+        schema = task.output_pydantic.__name__ if task.output_pydantic is not None else None
+        detection = stage == STAGES[0][0]
+        key = stage_key(stage, configs[stage], detection_inputs if detection else key_inputs,
+                        outputs[-1].raw if outputs else None, model_name, schema,
+                        tool_model=crew_base.routes[VISION_ROUTE] if detection else None)
+
+        entry = checkpoint_store.get(key) if use_checkpoints else None
+        if entry is not None:
+            output = _restore(task, entry)
+            task.output = output
+            if entry.get("hazards") is not None:
+                # The stored output only lists the hazards passed downstream; the acceptable
+                # ones are needed again to complete the reduction table.
+                crew_base.scored = score_tables([[Hazard(**hazard) for hazard in entry["hazards"]]])[0]
+            registry.inc("checkpoint_hits_total", stage=stage)
+            logger.info(f"Restored stage {stage} from checkpoint {key[:12]}.")
+            if crew.task_callback is not None:
+                crew.task_callback(output)
+        else:
+            context = aggregate_raw_outputs_from_task_outputs(outputs[-1:])
+            output = task.execute_sync(agent=task.agent, context=context, tools=task.agent.tools)
+            if _is_complete(stage, output):
+                entry = {"stage": stage, "output": output.model_dump(mode="json")}
+                if stage == "risk_assessment" and crew_base.scored is not None:
+                    entry["hazards"] = [asdict(hazard) for hazard in crew_base.scored.hazards]
+                checkpoint_store.put(key, entry)
+        outputs.append(output)
+
+    crew.usage_metrics = crew.calculate_usage_metrics()
+    last = outputs[-1]
+    return CrewOutput(
+        raw=last.raw,
+        pydantic=last.pydantic,
+        json_dict=last.json_dict,
+        tasks_output=outputs,
+        token_usage=crew.usage_metrics,
+    )
@@ -1,33 +1,72 @@
 # crews/crew.py
 import os
-
-from crewai import Agent, Crew, Process, Task
+import asyncio
+import hashlib
+import threading
+import functools
+import weakref
+from typing import Callable, Dict, Optional
+
+from crewai import LLM, Agent, Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import PDFSearchTool, VisionTool
 
+from api.models import clear_model_cache, get_company_name
+from crews.cache import config_digest, index_images, result_cache
+from crews.checkpoints import run_stages
+from crews.pool import CrewPool
+from crews.retrieval import clear_regulation_tools, get_regulation_search_tools
+from crews.routing import PLANNING_ROUTE, VISION_ROUTE, resolve_routes, routes_signature
+from crews.schemas import RiskAssessmentTable, RiskReductionTable, extract_rows
+from crews.scoring import ScoredTable, apply_to_assessment, apply_to_reduction, parse_assessment, score_tables
+from crews.settings import EXECUTION_MODES, MODEL
+from crews.tools import clear_vision_tools, get_regulation_lookup_tool, get_site_vision_tool
 from utils.crews import set_openai_api_key_for_crewtools
+from utils.images import join_images
+from utils.logs import LoggerSetup
+from utils.metrics import RunMetrics, registry
+from utils.phash import image_index
 
 
-위험성평가_이행점검_매뉴얼 = "src/pdfs/붙임1._2022_위험성평가_이행점검_매뉴얼.pdf"
-위험성평가에_관한_지침 = "src/pdfs/사업장 위험성평가에 관한 지침(고용노동부고시)(제2023-19호)(20230522).pdf"
-산업안전보건기준에_관한_규칙 = "src/pdfs/산업안전보건기준에 관한 규칙(고용노동부령)(제00417호)(20240628).pdf"
+logger = LoggerSetup("crews.crew").logger
 
-MODEL="gpt-4o"
+# Maximum number of concurrent `arun_crew` calls per provider (see `COMMERCIAL_MODELS`).
+PROVIDER_CONCURRENCY = {
+    "OpenAI": int(os.getenv("OPENAI_CONCURRENCY", "4")),
+    "Anthropic": int(os.getenv("ANTHROPIC_CONCURRENCY", "2")),
+}
+DEFAULT_CONCURRENCY = 2
 
 
-class OpenAIKeyWrapper:
-    def __enter__(self):
-        # 환경 변수 설정
-        self.original_key = os.environ.get("OPENAI_API_KEY", None)
-        os.environ["OPENAI_API_KEY"] = set_openai_api_key_for_crewtools(MODEL)
-    
-    def __exit__(self, exc_type, exc_value, traceback):
-        # 원래 키 복원
-        if self.original_key is not None:
-            os.environ["OPENAI_API_KEY"] = self.original_key
-        else:
-            del os.environ["OPENAI_API_KEY"]
+class CrewCancelled(BaseException):
+    """
+    Raised inside a running crew to abort it at the next agent step. Not an
+    `Exception`, so crewai does not retry the task it interrupts.
+    """
+
+
+class RunHooks:
+    """
+    Forwards the crew's step and task callbacks to per-run handlers. A pooled
+    crew keeps the same hooks object for its lifetime while the handlers are
+    swapped by whoever currently holds the crew.
+
+    Attributes:
+        step_callback (Optional[Callable]): Called with each agent step.
+        task_callback (Optional[Callable]): Called with each `TaskOutput`.
+    """
+
+    def __init__(self):
+        self.step_callback: Optional[Callable] = None
+        self.task_callback: Optional[Callable] = None
+
+    def on_step(self, step) -> None:
+        if self.step_callback is not None:
+            self.step_callback(step)
 
+    def on_task(self, output) -> None:
+        if self.task_callback is not None:
+            self.task_callback(output)
 
 
 @CrewBase
@@ -40,8 +79,78 @@ class RiskAssessmentCrew():
     Attributes:
         agents_config (dict): Configuration for initializing agents.
         tasks_config (dict): Configuration for initializing tasks.
+        openai_api_key (str): OpenAI API key used by the OpenAI-routed agents, the tools and the planner.
+        structured (bool): Whether `risk_assessment` and `risk_reduction` return validated
+            pydantic objects (see `crews.schemas`) instead of markdown.
+        routes (Dict[str, str]): The model of each agent, the vision tool and the planner.
+        api_keys (Dict[str, str]): API key per provider of the routed models.
+        hooks (RunHooks): Per-run step and task callback dispatcher.
+        scored (Optional[ScoredTable]): Grades computed from this run's assessment.
+        built_crew (Crew): The crew created by `crew`, once built.
     """
 
+    def __init__(self, openai_api_key: Optional[str] = None, structured: bool = False,
+                 routes: Optional[Dict[str, str]] = None, api_keys: Optional[Dict[str, str]] = None):
+        """
+        Initializes a RiskAssessmentCrew instance.
+
+        Args:
+            openai_api_key (Optional[str]): OpenAI API key for this crew. Resolved with
+                `set_openai_api_key_for_crewtools` when omitted. Every LLM and tool of the
+                crew receives the key explicitly, so no process-global state is touched.
+            structured (bool): Enables the structured-output mode.
+            routes (Optional[Dict[str, str]]): Models per route, see `crews.routing`. Defaults
+                to `resolve_routes()`.
+            api_keys (Optional[Dict[str, str]]): API key per provider of the routed models,
+                keyed like `COMMERCIAL_MODELS`. OpenAI falls back to `openai_api_key`; other
+                providers without a key fall back to litellm's environment variables.
+        """
+        self.openai_api_key = openai_api_key or set_openai_api_key_for_crewtools(MODEL)
+        self.structured = structured
+        self.routes = routes or resolve_routes()
+        self.api_keys = api_keys or {}
+        self.hooks = RunHooks()
+        self.scored: Optional[ScoredTable] = None
+        self.built_crew = None
+
+    def _api_key(self, model_name: str) -> Optional[str]:
+        provider = get_company_name(model_name)
+        if provider == "OpenAI":
+            return self.api_keys.get(provider) or self.openai_api_key
+        return self.api_keys.get(provider)
+
+    def _agent_llm(self, route: str) -> LLM:
+        model_name = self.routes[route]
+        return LLM(model=model_name, api_key=self._api_key(model_name))
+
+    def _output_format(self, task_name: str, schema) -> dict:
+        if not self.structured:
+            return {}
+        return {
+            "output_pydantic": schema,
+            "expected_output": self.tasks_config[task_name]['expected_output_structured']
+        }
+
+    # A task's own callback replaces the crew's `task_callback` for that task, so both
+    # callbacks below hand the completed output on to `hooks.on_task` themselves.
+
+    def _score_assessment(self, output) -> None:
+        # Grades are computed from the agent's S and F ratings; only hazards that need
+        # measures are passed on to `risk_reduction`.
+        hazards = parse_assessment(output)
+        if not hazards:
+            logger.warning("No severity and frequency ratings found; passing the assessment on unchanged.")
+            self.scored = None
+        else:
+            self.scored = score_tables([hazards])[0]
+            apply_to_assessment(output, self.scored)
+        self.hooks.on_task(output)
+
+    def _complete_reduction(self, output) -> None:
+        if self.scored is not None:
+            apply_to_reduction(output, self.scored)
+        self.hooks.on_task(output)
+
     @agent
     def integrated_risk_detector(self) -> Agent:
         """
@@ -61,11 +170,11 @@ class RiskAssessmentCrew():
         """
         return Agent(
             config=self.agents_config['integrated_risk_detector'],
+            llm=self._agent_llm('integrated_risk_detector'),
             tools=[
-                VisionTool(
-                    config={
-                        "api_key": set_openai_api_key_for_crewtools(MODEL)
-                    }
+                get_site_vision_tool(
+                    api_key=self._api_key(self.routes[VISION_ROUTE]),
+                    model=self.routes[VISION_ROUTE]
                 )
             ],
             verbose=True
@@ -89,20 +198,13 @@ class RiskAssessmentCrew():
         """
         return Agent(
             config=self.agents_config['risk_assessment_expert'],
+            llm=self._agent_llm('risk_assessment_expert'),
             tools=[
-                PDFSearchTool(
-                    pdf=i,
-                    llm={
-                        "config": {
-                            "api_key": set_openai_api_key_for_crewtools(MODEL)
-                        }
-                    }
-                )
-                for i in [
-                    위험성평가_이행점검_매뉴얼, 
-                    위험성평가에_관한_지침, 
-                    산업안전보건기준에_관한_규칙
-                ]
+                *get_regulation_search_tools(
+                    api_key=self.openai_api_key,
+                    model=MODEL
+                ),
+                get_regulation_lookup_tool()
             ],
             verbose=True
         )
@@ -125,20 +227,13 @@ class RiskAssessmentCrew():
         """
         return Agent(
             config=self.agents_config['risk_reduction_expert'],
+            llm=self._agent_llm('risk_reduction_expert'),
             tools=[
-                PDFSearchTool(
-                    pdf=i,
-                    llm={
-                        "config": {
-                            "api_key": set_openai_api_key_for_crewtools(MODEL)
-                        }
-                    }
-                )
-                for i in [
-                    위험성평가_이행점검_매뉴얼, 
-                    위험성평가에_관한_지침, 
-                    산업안전보건기준에_관한_규칙
-                ]
+                *get_regulation_search_tools(
+                    api_key=self.openai_api_key,
+                    model=MODEL
+                ),
+                get_regulation_lookup_tool()
             ],
             verbose=True
         )
@@ -167,14 +262,17 @@ class RiskAssessmentCrew():
         and assign risk levels.
 
         Task Description:
-            위험 요소를 심각도(S)와 빈도(F)를 기준으로 평가하고 위험 등급을 부여합니다.
+            위험 요소를 심각도(S)와 빈도(F)를 기준으로 평가합니다. 위험 등급과 위험 수준은
+            `_score_assessment`가 계산합니다.
 
         Returns:
             Task: An instance configured for risk assessment.
         """
         return Task(
             config=self.tasks_config['risk_assessment'],
-            agent=self.risk_assessment_expert()
+            agent=self.risk_assessment_expert(),
+            callback=self._score_assessment,
+            **self._output_format('risk_assessment', RiskAssessmentTable)
         )
 
     @task
@@ -184,55 +282,364 @@ class RiskAssessmentCrew():
         risks with unacceptable levels.
 
         Task Description:
-            위험 평가 결과를 분석하여 실질적인 위험 감소 조치를 제안합니다.
+            위험 저감이 필요한 위험 요인에 대해 실질적인 위험 감소 조치를 제안합니다.
 
         Returns:
             Task: An instance configured for risk reduction.
         """
         return Task(
             config=self.tasks_config['risk_reduction'],
-            agent=self.risk_reduction_expert()
+            agent=self.risk_reduction_expert(),
+            callback=self._complete_reduction,
+            **self._output_format('risk_reduction', RiskReductionTable)
         )
 
     @crew
-    def crew(self, model) -> Crew:
+    def crew(self, model, mode: str = "hierarchical") -> Crew:
         """
         Creates the RiskAssessment crew, combining agents and tasks for hierarchical 
         risk management.
 
         Args:
             model (LLM): The large language model used for task management.
+            mode (str): One of `EXECUTION_MODES`. "sequential" skips planning and the
+                manager, handing each task's output directly to the next task.
 
         Returns:
             Crew: A configured crew for managing risk assessment workflows.
+
+        Raises:
+            ValueError: If mode is not one of `EXECUTION_MODES`.
         """
+        if mode == "sequential":
+            return Crew(
+                agents=self.agents,
+                tasks=self.tasks,
+                process=Process.sequential,
+                verbose=True,
+                planning=False,
+                step_callback=self.hooks.on_step,
+                task_callback=self.hooks.on_task
+            )
+        if mode != "hierarchical":
+            raise ValueError(f"mode should be one of {EXECUTION_MODES} (given: {mode})")
         return Crew(
             agents=self.agents,  # Automatically created by the @agent decorator
             tasks=self.tasks,    # Automatically created by the @task decorator
             process=Process.hierarchical,
             manager_llm=model,
             verbose=True,
-            planning=True
+            planning=True,
+            planning_llm=self._agent_llm(PLANNING_ROUTE),
+            step_callback=self.hooks.on_step,
+            task_callback=self.hooks.on_task
         )
 
+    def build(self, model, mode: str = "hierarchical") -> "RiskAssessmentCrew":
+        """
+        Builds the crew once so that the instance can be pooled and kicked off repeatedly.
+
+        Args:
+            model (LLM): The large language model used for task management.
+            mode (str): One of `EXECUTION_MODES`.
+
+        Returns:
+            RiskAssessmentCrew: This instance, with `built_crew` set.
+        """
+        self.built_crew = self.crew(model, mode)
+        return self
+
+    def reset(self) -> None:
+        """
+        Prepares a pooled instance for its next run.
+        """
+        self.hooks.step_callback = None
+        self.hooks.task_callback = None
+        self.scored = None
+        reset_crew(self.built_crew)
+
+
+def reset_crew(crew: Crew) -> None:
+    """
+    Clears the per-run state of a crew so that it can be kicked off again from
+    the pool as if it were freshly built.
+
+    Args:
+        crew (Crew): The crew returned by a previous kickoff.
+    """
+    for crew_task in crew.tasks:
+        crew_task.output = None
+        crew_task.used_tools = 0
+        crew_task.tools_errors = 0
+        crew_task.delegations = 0
+        crew_task.processed_by_agents = set()
+    for crew_agent in crew.agents:
+        crew_agent.tools_results = []
+        crew_agent._times_executed = 0  # crewai's retry counter of `Agent.execute_task`
+        token_process = getattr(crew_agent, "_token_process", None)
+        if token_process is not None:
+            for name, value in vars(token_process).items():
+                if isinstance(value, int):
+                    setattr(token_process, name, 0)
+    # The manager agent is recreated from `manager_llm` on the next kickoff.
+    crew.manager_agent = None
+    crew.usage_metrics = None
+
+
+crew_pool = CrewPool(reset=RiskAssessmentCrew.reset)
+
+
+def _chain(*callbacks: Optional[Callable]) -> Callable:
+    callbacks = [callback for callback in callbacks if callback is not None]
+
+    def call(arg) -> None:
+        for callback in callbacks:
+            callback(arg)
+    return call
+
+
+_pooled_config: Optional[str] = None
+
+
+def invalidate_resources() -> None:
+    """
+    Drops every process-wide resource: pooled crews, shared LLMs, vision tools and
+    loaded regulation search tools. Everything is rebuilt lazily on the next run.
+    """
+    crew_pool.clear()
+    clear_model_cache()
+    clear_vision_tools()
+    clear_regulation_tools()
+    logger.info("Invalidated cached crews, models and tools.")
+
+
+def _key_digest(api_key: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] if api_key else None
+
+
+def _pool_key(model, tools_api_key, mode, structured, routes, api_keys) -> tuple:
+    global _pooled_config
+    # Crews built from an outdated agents.yaml/tasks.yaml must not be reused.
+    digest = config_digest()
+    if _pooled_config is not None and digest != _pooled_config:
+        logger.info("Crew configuration changed, clearing the crew pool.")
+        crew_pool.clear()
+    _pooled_config = digest
+    # Keys live as long as the pool and may be logged, so they hold digests of the API keys only.
+    return (
+        getattr(model, "model", str(model)),
+        _key_digest(getattr(model, "api_key", None)),
+        _key_digest(tools_api_key),
+        mode,
+        structured,
+        routes_signature(routes),
+        tuple(sorted((provider, _key_digest(api_key)) for provider, api_key in api_keys.items())),
+        digest
+    )
+
+
+def cached_result(model, image, tasks, mode="hierarchical", structured=False,
+                  routes: Optional[Dict[str, str]] = None, tools_api_key: Optional[str] = None) -> Optional[CrewOutput]:
+    """
+    Looks up a previously completed assessment in `result_cache`.
+
+    Args:
+        model (LLM): The large language model managing the workflow.
+        image (str | List[str]): Path or identifier of the construction site image, or of several
+            images of the same work area, which are analyzed together.
+        tasks (list): List of task descriptions.
+        mode (str): One of `EXECUTION_MODES`.
+        structured (bool): Whether the structured-output mode was used.
+        routes (Optional[Dict[str, str]]): The routed models. Defaults to `resolve_routes()`.
+        tools_api_key (Optional[str]): The OpenAI API key of the run. Results are only shared
+            between runs with the same key.
 
-def run_crew(model, image, tasks):
+    Returns:
+        Optional[CrewOutput]: The cached output, or None on a miss.
+    """
+    cache_key = result_cache.key(join_images(image), tasks, getattr(model, "model", str(model)), mode, structured,
+                                 routes_signature(routes or resolve_routes()), _key_digest(tools_api_key))
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        return None
+    logger.info(f"Result cache hit: {cache_key}")
+    registry.inc("result_cache_hits_total", mode=mode)
+    output = CrewOutput.model_validate(cached["output"])
+    if structured and cached["output"].get("pydantic"):
+        # `CrewOutput.pydantic` is typed as a bare BaseModel and loses its fields on validation.
+        output.pydantic = RiskReductionTable.model_validate(cached["output"]["pydantic"])
+    return output
+
+
+def run_crew(model, image, tasks, step_callback=None, task_callback=None, use_cache=True, tools_api_key=None,
+             mode="hierarchical", metrics: Optional[RunMetrics] = None, structured=False,
+             routes: Optional[Dict[str, str]] = None, api_keys: Optional[Dict[str, str]] = None):
     """
     Executes the RiskAssessmentCrew by kicking off the process with the provided 
-    inputs.
+    inputs. The crew is taken from `crew_pool` and returned to it afterwards.
+
+    Identical requests (same image content, normalized task, models, crew config
+    and API key) are answered from `result_cache` without running the crew. Sequential
+    runs resume from stage checkpoints (see `crews.checkpoints`), so only the stages
+    whose inputs changed are executed. Photos of a successful run are indexed, and
+    later near-duplicates of them reuse their vision description and detection
+    output (see `utils.phash`). Every executed run is recorded with `RunMetrics`
+    and exported to `METRICS_DIR`.
 
     Args:
         model (LLM): The large language model managing the workflow.
-        image (str): Path or identifier of the construction site image.
+        image (str | List[str]): Path or identifier of the construction site image, or of several
+            images of the same work area, which are analyzed together.
         tasks (list): List of task descriptions.
+        step_callback (Callable, optional): Called with each agent step of this run.
+        task_callback (Callable, optional): Called with each `TaskOutput` of this run.
+        use_cache (bool): Set to False to bypass the result cache, checkpoint and stored
+            vision lookups, regenerating and overwriting them.
+        tools_api_key (str, optional): OpenAI API key for the agents and tools. Resolved
+            with `set_openai_api_key_for_crewtools` when omitted, which reads the
+            Streamlit session of the calling thread.
+        mode (str): One of `EXECUTION_MODES`. Defaults to "hierarchical".
+        metrics (RunMetrics, optional): Collector for this run, e.g. to display its
+            `summary()` afterwards. A new one is created when omitted.
+        structured (bool): Have `risk_assessment` and `risk_reduction` return validated
+            pydantic objects; read the table with `crews.schemas.extract_rows`.
+        routes (Dict[str, str], optional): Model of each agent, the vision tool and the
+            planner, see `crews.routing.resolve_routes`. Defaults to the configured routes.
+        api_keys (Dict[str, str], optional): API keys of the routed models' providers,
+            keyed like `COMMERCIAL_MODELS`. OpenAI falls back to `tools_api_key`.
 
     Returns:
         Output from the kickoff process of the RiskAssessmentCrew.
     """
-    with OpenAIKeyWrapper():
-        return RiskAssessmentCrew().crew(model).kickoff(
-            inputs={
-                'image': image,
-                'tasks': tasks
-            }
-        )
+    image = join_images(image)
+    routes = routes or resolve_routes()
+    tools_api_key = tools_api_key or set_openai_api_key_for_crewtools(MODEL)
+    if use_cache:
+        cached = cached_result(model, image, tasks, mode, structured, routes, tools_api_key)
+        if cached is not None:
+            return cached
+
+    api_keys = api_keys or {}
+    with crew_pool.acquire(_pool_key(model, tools_api_key, mode, structured, routes, api_keys),
+                           lambda: RiskAssessmentCrew(openai_api_key=tools_api_key, structured=structured, routes=routes,
+                                                      api_keys=api_keys).build(model, mode)) as crew_base, \
+         image_index.refreshing(not use_cache):
+        metrics = metrics or RunMetrics(mode=mode, model=getattr(model, "model", str(model)), structured=structured)
+        crew_base.hooks.step_callback = _chain(metrics.on_step, step_callback)
+        crew_base.hooks.task_callback = _chain(metrics.on_task, task_callback)
+        # Finish before the crew is released: the pool reset clears its counters.
+        with metrics.activate(crew_base.built_crew):
+            try:
+                if mode == "sequential":
+                    result = run_stages(crew_base, image, tasks, use_checkpoints=use_cache)
+                else:
+                    result = crew_base.built_crew.kickoff(
+                        inputs={
+                            'image': image,
+                            'tasks': tasks
+                        }
+                    )
+            except BaseException as e:
+                metrics.finish(error=e)
+                raise
+            metrics.finish(result)
+
+    index_images(image)
+    try:
+        result_cache.put(result_cache.key(image, tasks, getattr(model, "model", str(model)), mode, structured,
+                                          routes_signature(routes), _key_digest(tools_api_key)), {
+            "raw": result.raw,
+            "rows": extract_rows(result),
+            "output": result.model_dump(mode="json"),
+        })
+    except Exception as e:
+        logger.warning(f"Failed to cache result: {e}")
+    return result
+
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def _provider_semaphore(model) -> asyncio.Semaphore:
+    try:
+        provider = get_company_name(getattr(model, "model", str(model)))
+    except ValueError:
+        provider = None
+    semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    if provider not in semaphores:
+        semaphores[provider] = asyncio.Semaphore(PROVIDER_CONCURRENCY.get(provider, DEFAULT_CONCURRENCY))
+    return semaphores[provider]
+
+
+async def arun_crew(model, image, tasks, timeout: Optional[float] = None, step_callback=None, task_callback=None,
+                    use_cache=True, tools_api_key=None, mode="hierarchical", metrics: Optional[RunMetrics] = None,
+                    structured=False, routes: Optional[Dict[str, str]] = None, api_keys: Optional[Dict[str, str]] = None):
+    """
+    Asynchronous counterpart of `run_crew`. Runs are bounded per provider by
+    `PROVIDER_CONCURRENCY`, and each run executes on the default executor so that
+    many assessments can share one event loop.
+
+    When the awaiting task is cancelled or `timeout` expires, the running crew is
+    aborted at its next agent step with `CrewCancelled`, and the provider slot is
+    held until the crew has actually stopped. Individual LLM requests are bounded
+    by the model's own `timeout` (see `get_model`).
+
+    Args:
+        model (LLM): The large language model managing the workflow.
+        image (str | List[str]): Path or identifier of the construction site image, or of several
+            images of the same work area, which are analyzed together.
+        tasks (list): List of task descriptions.
+        timeout (float, optional): Seconds to wait for the run, including queueing.
+        step_callback (Callable, optional): Called with each agent step of this run.
+        task_callback (Callable, optional): Called with each `TaskOutput` of this run.
+        use_cache (bool): Set to False to bypass the result cache lookup.
+        tools_api_key (str, optional): OpenAI API key for the agents and tools.
+        mode (str): One of `EXECUTION_MODES`. Defaults to "hierarchical".
+        metrics (RunMetrics, optional): Collector for this run.
+        structured (bool): Enables the structured-output mode.
+        routes (Dict[str, str], optional): Model of each agent, the vision tool and the planner.
+        api_keys (Dict[str, str], optional): API keys of the routed models' providers.
+
+    Returns:
+        Output from the kickoff process of the RiskAssessmentCrew.
+
+    Raises:
+        asyncio.TimeoutError: If the run did not finish within `timeout`.
+    """
+    image = join_images(image)
+    routes = routes or resolve_routes()
+    # Resolve credentials here: executor threads have no Streamlit session.
+    tools_api_key = tools_api_key or set_openai_api_key_for_crewtools(MODEL)
+    if use_cache:
+        cached = cached_result(model, image, tasks, mode, structured, routes, tools_api_key)
+        if cached is not None:
+            return cached
+
+    cancelled = threading.Event()
+
+    def guarded_step(step):
+        if cancelled.is_set():
+            raise CrewCancelled("Risk assessment was cancelled.")
+        if step_callback is not None:
+            step_callback(step)
+
+    async def run():
+        async with _provider_semaphore(model):
+            future = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(run_crew, model, image, tasks,
+                                        step_callback=guarded_step, task_callback=task_callback,
+                                        use_cache=use_cache, tools_api_key=tools_api_key, mode=mode,
+                                        metrics=metrics, structured=structured, routes=routes,
+                                        api_keys=api_keys)
+            )
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                cancelled.set()
+                try:
+                    await future
+                except (Exception, CrewCancelled):
+                    pass
+                raise
+
+    return await asyncio.wait_for(run(), timeout)
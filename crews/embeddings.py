@@ -0,0 +1,119 @@
+# crews/embeddings.py
+"""
+Embedding backends for the regulation index.
+
+"openai" embeds through the provider API. "local" runs multilingual-e5-small, which
+handles Korean, as an ONNX model on the CPU: the model files are downloaded from the
+Hugging Face Hub once and cached, after which ingestion and queries need no network.
+"""
+import os
+import threading
+from typing import Dict, List, Optional
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from embedchain.config import BaseEmbedderConfig
+from embedchain.embedder.base import BaseEmbedder
+
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("crews.embeddings").logger
+
+LOCAL_EMBEDDING_REPO = os.getenv("LOCAL_EMBEDDING_REPO", "intfloat/multilingual-e5-small")
+LOCAL_EMBEDDING_FILE = os.getenv("LOCAL_EMBEDDING_FILE", "onnx/model.onnx")
+LOCAL_EMBEDDING_DIMENSION = 384
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0: let onnxruntime decide
+MAX_SEQUENCE_LENGTH = 512
+
+# e5 models expect a prefix. Embedchain embeds chunks and queries with the same function,
+# so the symmetric "query: " prefix is used for both, as the model card recommends for
+# tasks other than asymmetric passage retrieval.
+E5_PREFIX = "query: "
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction):
+    """
+    Chroma embedding function running a sentence embedding model with onnxruntime.
+    Texts are encoded in batches of `batch_size`, mean-pooled over the attention mask
+    and L2-normalized.
+
+    Args:
+        repo_id (str): Hugging Face Hub repository of the model.
+        filename (str): Path of the ONNX graph within the repository.
+        batch_size (int): Texts per inference call.
+    """
+
+    def __init__(self, repo_id: str = LOCAL_EMBEDDING_REPO, filename: str = LOCAL_EMBEDDING_FILE,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQUENCE_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = EMBEDDING_THREADS
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(repo_id, filename), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        logger.info(f"Loaded local embedding model {repo_id}.")
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch([E5_PREFIX + text for text in texts])
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]  # (batch, tokens, dimension)
+        mask = feeds["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.tolist()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        # Sorting by length keeps the padding within a batch small.
+        order = sorted(range(len(input)), key=lambda i: len(input[i]))
+        embeddings: List[Optional[List[float]]] = [None] * len(input)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, embedding in zip(batch, self._encode_batch([input[i] for i in batch])):
+                embeddings[i] = embedding
+        return embeddings
+
+
+class LocalEmbedder(BaseEmbedder):
+    """
+    Embedchain embedder backed by a shared `OnnxEmbeddingFunction`.
+    """
+
+    def __init__(self, config: Optional[BaseEmbedderConfig] = None):
+        super().__init__(config=config or BaseEmbedderConfig(model=LOCAL_EMBEDDING_REPO))
+        self.set_embedding_fn(embedding_fn=get_local_embedding_function())
+        self.set_vector_dimension(vector_dimension=LOCAL_EMBEDDING_DIMENSION)
+
+
+_functions: Dict[str, OnnxEmbeddingFunction] = {}
+_lock = threading.Lock()
+
+
+def get_local_embedding_function() -> OnnxEmbeddingFunction:
+    """
+    Returns the process-wide ONNX embedding function, loading the model on first use.
+
+    Returns:
+        OnnxEmbeddingFunction: The shared embedding function.
+    """
+    with _lock:
+        if LOCAL_EMBEDDING_REPO not in _functions:
+            _functions[LOCAL_EMBEDDING_REPO] = OnnxEmbeddingFunction()
+        return _functions[LOCAL_EMBEDDING_REPO]
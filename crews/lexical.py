@@ -0,0 +1,315 @@
+# crews/lexical.py
+"""
+Offline, article-structured keyword index over the regulation PDFs.
+
+Articles (조) are split into paragraphs (항), whose items (호) stay addressable,
+and every paragraph is scored with BM25 over character bigrams, which suits
+Korean without a morphological analyzer. Exact references such as "제14조" or
+"제42조 제1항 제2호" are answered from a dictionary instead of being searched.
+
+The parsed documents are stored under `INDEX_DIR` keyed by the PDF contents,
+so the PDFs are only parsed again when they change. Prebuild with:
+    python -m crews.lexical
+"""
+import os
+import re
+import math
+import json
+import heapq
+import hashlib
+import threading
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from crews.settings import INDEX_DIR, REGULATION_PDFS, REGULATION_TITLES, 산업안전보건기준에_관한_규칙
+from utils.functions import file_digest
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("crews.lexical").logger
+
+INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+ARTICLE_PATTERN = re.compile(r"^제\s*(\d+)\s*조(?:\s*의\s*(\d+))?\s*(?:\(([^)]*)\)|(삭제))")
+HEADING_PATTERN = re.compile(r"^제\s*\d+\s*(?:편|장|절|관)(?:\s|$)")
+APPENDIX_PATTERN = re.compile(r"^\[?\s*별\s*(?:표|지)")
+PAGE_NOISE_PATTERN = re.compile(r"^법제처\s+\d+\s+국가법령정보센터$")
+PARAGRAPH_PATTERN = re.compile(r"(?=[①-⑳])")  # ① .. ⑳
+ITEM_PATTERN = re.compile(r"^(\d+)\.\s")
+REFERENCE_PATTERN = re.compile(
+    r"제?\s*(\d+)\s*조(?:\s*의\s*(\d+))?(?:\s*제?\s*(\d+)\s*항)?(?:\s*제?\s*(\d+)\s*호)?"
+)
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z]+|\d+")
+
+
+@dataclass
+class Unit:
+    """
+    One searchable passage: a paragraph (항) of an article, a whole article without
+    paragraphs, or a page of a document without articles.
+    """
+    document: str
+    article: Optional[str]    # e.g. "14" or "14-2" for 제14조의2
+    title: str
+    paragraph: Optional[int]
+    text: str
+
+    @property
+    def citation(self) -> str:
+        name = REGULATION_TITLES.get(self.document, os.path.basename(self.document))
+        if self.article is None:
+            return f"{name} {self.title}"
+        number, _, sub = self.article.partition("-")
+        label = f"제{number}조" + (f"의{sub}" if sub else "") + (f"({self.title})" if self.title else "")
+        return f"{name} {label}" + (f" 제{self.paragraph}항" if self.paragraph else "")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into terms: character bigrams of Hangul words, whole Latin words and numbers.
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def _article_key(number: str, sub: Optional[str]) -> str:
+    return f"{int(number)}-{int(sub)}" if sub else str(int(number))
+
+
+def parse_pages(document: str, pages: List[str]) -> List[Unit]:
+    """
+    Splits the text of a document into units at article (조) and paragraph (항)
+    boundaries. Documents without articles are split into pages.
+
+    Args:
+        document (str): Path of the PDF, used as the document id.
+        pages (List[str]): Extracted text of each page.
+
+    Returns:
+        List[Unit]: The units in document order.
+    """
+    articles: List[Tuple[str, str, List[str]]] = []
+    current: Optional[Tuple[str, str, List[str]]] = None
+    last = (0, 0)
+    for page in pages:
+        for line in page.splitlines():
+            line = line.strip()
+            if not line or PAGE_NOISE_PATTERN.match(line) or HEADING_PATTERN.match(line):
+                continue
+            if APPENDIX_PATTERN.match(line):
+                current = None  # Appendix tables until the next article header
+                continue
+            match = ARTICLE_PATTERN.match(line)
+            # Article numbers only increase, which rejects wrapped lines that start with a reference.
+            if match and (int(match.group(1)), int(match.group(2) or 0)) > last:
+                last = (int(match.group(1)), int(match.group(2) or 0))
+                current = (_article_key(match.group(1), match.group(2)), match.group(3) or match.group(4), [line[match.end():].strip()])
+                articles.append(current)
+            elif current is not None:
+                current[2].append(line)
+
+    if not articles:
+        return [Unit(document, None, f"{i}쪽", None, text.strip()) for i, text in enumerate(pages, start=1) if text.strip()]
+
+    units = []
+    for key, title, lines in articles:
+        body = "\n".join(line for line in lines if line)
+        paragraphs = [part.strip() for part in PARAGRAPH_PATTERN.split(body) if part.strip()]
+        if len(paragraphs) > 1 or (paragraphs and "①" <= paragraphs[0][0] <= "⑳"):
+            for paragraph in paragraphs:
+                number = ord(paragraph[0]) - 0x2460 + 1 if "①" <= paragraph[0] <= "⑳" else None
+                units.append(Unit(document, key, title, number, paragraph))
+        else:
+            units.append(Unit(document, key, title, None, body))
+    return units
+
+
+def extract_pages(path: str) -> List[str]:
+    from pypdf import PdfReader  # Deferred: only needed to (re)build the index
+
+    return [page.extract_text() or "" for page in PdfReader(path).pages]
+
+
+class RegulationIndex:
+    """
+    BM25 keyword search and exact article lookup over parsed regulation units.
+
+    Args:
+        units (List[Unit]): The units returned by `parse_pages`.
+    """
+
+    def __init__(self, units: List[Unit]):
+        self.units = units
+        self.articles: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, unit in enumerate(units):
+            if unit.article is not None:
+                self.articles[(unit.document, unit.article)].append(i)
+
+        # Postings hold the final BM25 weight of each (term, unit), so a query is a sum of lookups.
+        tokenized = [tokenize(f"{unit.title} {unit.text}") for unit in units]
+        average = sum(map(len, tokenized)) / max(len(tokenized), 1)
+        frequencies = defaultdict(list)
+        for i, tokens in enumerate(tokenized):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / (average or 1))
+            for term, tf in Counter(tokens).items():
+                frequencies[term].append((i, tf * (BM25_K1 + 1) / (tf + norm)))
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for term, postings in frequencies.items():
+            idf = math.log(1 + (len(units) - len(postings) + 0.5) / (len(postings) + 0.5))
+            self.postings[term] = [(i, weight * idf) for i, weight in postings]
+
+    def search(self, query: str, k: int = 5, document: Optional[str] = None) -> List[Tuple[float, Unit]]:
+        """
+        Ranks the units by BM25 score.
+
+        Args:
+            query (str): Keywords in Korean.
+            k (int): Number of results.
+            document (Optional[str]): Restrict the results to one PDF.
+
+        Returns:
+            List[Tuple[float, Unit]]: Score and unit, best first.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            for i, weight in self.postings.get(term, ()):
+                scores[i] += weight
+        if document is not None:
+            scores = {i: score for i, score in scores.items() if self.units[i].document == document}
+        return [(score, self.units[i]) for i, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1])]
+
+    def lookup(self, article: str, paragraph: Optional[int] = None, item: Optional[int] = None,
+               document: str = 산업안전보건기준에_관한_규칙) -> Optional[str]:
+        """
+        Returns the text of an article, a paragraph or an item.
+
+        Args:
+            article (str): Article key, e.g. "14" or "14-2" for 제14조의2.
+            paragraph (Optional[int]): Paragraph (항) number.
+            item (Optional[int]): Item (호) number within the paragraph, or within the
+                article when it has no paragraphs.
+            document (str): Path of the PDF. Defaults to 산업안전보건기준에 관한 규칙.
+
+        Returns:
+            Optional[str]: The cited text, or None if it does not exist.
+        """
+        units = [self.units[i] for i in self.articles.get((document, article), [])]
+        if paragraph is not None:
+            units = [unit for unit in units if unit.paragraph == paragraph or (unit.paragraph is None and paragraph == 1)]
+        if not units:
+            return None
+        if item is not None:
+            lines = [line for unit in units for line in unit.text.splitlines()]
+            starts = [i for i, line in enumerate(lines) if ITEM_PATTERN.match(line)]
+            for i, start in enumerate(starts):
+                if int(ITEM_PATTERN.match(lines[start]).group(1)) == item:
+                    end = starts[i + 1] if i + 1 < len(starts) else len(lines)
+                    return f"[{units[0].citation} 제{item}호]\n" + "\n".join(lines[start:end])
+            return None
+        header = units[0].citation if paragraph is not None else Unit(document, article, units[0].title, None, "").citation
+        return f"[{header}]\n" + "\n".join(unit.text for unit in units)
+
+    def answer(self, query: str, k: int = 5) -> str:
+        """
+        Answers a tool query: cited articles are looked up exactly, anything else is searched.
+
+        Args:
+            query (str): An article reference such as "제14조 제1항", or keywords.
+            k (int): Number of search results.
+
+        Returns:
+            str: The matching regulation text with citations.
+        """
+        hinted = next((path for path, name in REGULATION_TITLES.items()
+                       if name in query or name.split()[-1] in query), None)
+        document = hinted or 산업안전보건기준에_관한_규칙
+        found = []
+        for match in REFERENCE_PATTERN.finditer(query):
+            article = _article_key(match.group(1), match.group(2))
+            paragraph = int(match.group(3)) if match.group(3) else None
+            item = int(match.group(4)) if match.group(4) else None
+            text = self.lookup(article, paragraph, item, document)
+            if text is None and document == 산업안전보건기준에_관한_규칙:
+                text = next(filter(None, (self.lookup(article, paragraph, item, path) for path in REGULATION_PDFS)), None)
+            if text is not None:
+                found.append(text)
+        if found:
+            return "\n\n".join(found)
+
+        results = self.search(query, k, hinted)
+        if not results:
+            return "관련 조문을 찾지 못했습니다."
+        return "\n\n".join(f"[{unit.citation}]\n{unit.text}" for _, unit in results)
+
+
+def lexical_index_key(pdfs: List[str] = REGULATION_PDFS) -> str:
+    combined = hashlib.sha256(f"{INDEX_VERSION}".encode() + "".join(file_digest(pdf) for pdf in pdfs).encode()).hexdigest()
+    return f"lexical-{combined[:16]}"
+
+
+def build_lexical_index(pdfs: List[str] = REGULATION_PDFS) -> RegulationIndex:
+    """
+    Parses the PDFs and stores the units under `INDEX_DIR`.
+
+    Args:
+        pdfs (List[str]): Paths of the PDFs to index.
+
+    Returns:
+        RegulationIndex: The index over the parsed units.
+    """
+    units = []
+    for pdf in pdfs:
+        logger.info(f"Parsing {pdf} for the lexical index.")
+        units.extend(parse_pages(pdf, extract_pages(pdf)))
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = os.path.join(INDEX_DIR, f"{lexical_index_key(pdfs)}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "units": [asdict(unit) for unit in units]}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return RegulationIndex(units)
+
+
+_index: Dict[str, RegulationIndex] = {}
+_lock = threading.Lock()
+
+
+def get_lexical_index() -> RegulationIndex:
+    """
+    Returns the process-wide lexical index, loading it from `INDEX_DIR` or building it on first use.
+
+    Returns:
+        RegulationIndex: The index over `REGULATION_PDFS`.
+    """
+    key = lexical_index_key()
+    with _lock:
+        if key not in _index:
+            path = os.path.join(INDEX_DIR, f"{key}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    _index.clear()
+                    _index[key] = RegulationIndex([Unit(**unit) for unit in json.load(f)["units"]])
+                logger.debug(f"Loaded lexical index {key}.")
+            else:
+                _index.clear()
+                _index[key] = build_lexical_index()
+        return _index[key]
+
+
+if __name__ == "__main__":
+    # Prebuild the index offline, optionally answering a query: `python -m crews.lexical "제14조"`
+    import sys
+
+    index = get_lexical_index()
+    print(f"{len(index.units)} units, {len(index.articles)} articles")
+    if len(sys.argv) > 1:
+        print(index.answer(" ".join(sys.argv[1:])))
@@ -0,0 +1,138 @@
+# crews/pool.py
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("crews.pool").logger
+
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", "2"))
+CREW_POOL_IDLE_TIMEOUT = float(os.getenv("CREW_POOL_IDLE_TIMEOUT", "1800"))
+CREW_POOL_MAX_IDLE = int(os.getenv("CREW_POOL_MAX_IDLE", "16"))
+
+
+class CrewPool:
+    """
+    A process-wide pool of prebuilt objects (typically crews), grouped by key.
+
+    At most `size` objects exist per key. Callers beyond that wait until one is
+    released. Idle objects are reset when released and evicted once they have
+    been idle for longer than `idle_timeout` seconds, or, oldest first, when more
+    than `max_idle` objects are idle across all keys.
+
+    Attributes:
+        size (int): Maximum number of pooled objects per key.
+        idle_timeout (float): Seconds an object may stay idle before eviction.
+        max_idle (int): Maximum number of idle objects across all keys.
+    """
+
+    def __init__(self,
+                 reset: Optional[Callable[[Any], None]] = None,
+                 size: int = CREW_POOL_SIZE,
+                 idle_timeout: float = CREW_POOL_IDLE_TIMEOUT,
+                 max_idle: int = CREW_POOL_MAX_IDLE):
+        """
+        Initializes a CrewPool instance.
+
+        Args:
+            reset (Optional[Callable[[Any], None]]): Called on every object when it is returned to the pool.
+            size (int): Maximum number of pooled objects per key. Defaults to `CREW_POOL_SIZE`.
+            idle_timeout (float): Idle eviction threshold in seconds. Defaults to `CREW_POOL_IDLE_TIMEOUT`.
+            max_idle (int): Maximum number of idle objects across all keys. Defaults to `CREW_POOL_MAX_IDLE`.
+
+        Raises:
+            ValueError: If size or max_idle is smaller than 1.
+        """
+        if size < 1:
+            raise ValueError(f"size should be at least 1 (given: {size})")
+        if max_idle < 1:
+            raise ValueError(f"max_idle should be at least 1 (given: {max_idle})")
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self._reset = reset
+        self._idle: Dict[Hashable, List[Tuple[float, Any]]] = {}
+        self._busy: Dict[Hashable, int] = {}
+        self._generation = 0  # Incremented by `clear`; objects checked out before are not pooled again
+        self._cond = threading.Condition()
+
+    def _evict_idle(self) -> None:
+        deadline = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            fresh = [(ts, obj) for ts, obj in self._idle[key] if ts >= deadline]
+            if len(fresh) != len(self._idle[key]):
+                logger.debug(f"Evicted {len(self._idle[key]) - len(fresh)} idle crew(s) for {key[0] if isinstance(key, tuple) else key}.")
+            if fresh:
+                self._idle[key] = fresh
+            else:
+                del self._idle[key]
+
+        idle = sorted(((ts, key) for key, entries in self._idle.items() for ts, _ in entries), key=lambda item: item[0])
+        for ts, key in idle[:max(0, len(idle) - self.max_idle)]:
+            # Entries of a key are appended in release order, so the oldest is first.
+            self._idle[key].pop(0)
+            if not self._idle[key]:
+                del self._idle[key]
+            logger.debug(f"Evicted the oldest idle crew for {key[0] if isinstance(key, tuple) else key}.")
+
+    @contextmanager
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Iterator[Any]:
+        """
+        Checks out an object for `key`, building one with `factory` if the pool has
+        spare capacity and blocking otherwise.
+
+        Args:
+            key (Hashable): The pool key, e.g. the manager model identity.
+            factory (Callable[[], Any]): Builds a new object for `key`.
+
+        Yields:
+            Any: A pooled object, reserved for the caller until the block exits.
+        """
+        with self._cond:
+            self._evict_idle()
+            while True:
+                if self._idle.get(key):
+                    _, obj = self._idle[key].pop()
+                    break
+                if self._busy.get(key, 0) + len(self._idle.get(key, [])) < self.size:
+                    obj = None
+                    break
+                self._cond.wait()
+            self._busy[key] = self._busy.get(key, 0) + 1
+            generation = self._generation
+
+        healthy = False
+        try:
+            if obj is None:
+                obj = factory()
+            yield obj
+            healthy = True
+        finally:
+            if healthy and self._reset is not None:
+                try:
+                    self._reset(obj)
+                except Exception as e:
+                    logger.warning(f"Dropping pooled crew that failed to reset: {e}")
+                    healthy = False
+            with self._cond:
+                self._busy[key] -= 1
+                if not self._busy[key]:
+                    del self._busy[key]
+                if healthy and generation == self._generation:
+                    self._idle.setdefault(key, []).append((time.monotonic(), obj))
+                self._evict_idle()
+                # Waiters of every key share the condition, so wake them all.
+                self._cond.notify_all()
+
+    def clear(self) -> None:
+        """
+        Drops every idle object. Objects currently checked out are discarded when
+        released, so nothing built before the call is handed out again.
+        """
+        with self._cond:
+            self._idle.clear()
+            self._generation += 1
@@ -0,0 +1,177 @@
+# crews/retrieval.py
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Tuple
+
+from crewai_tools.adapters.pdf_embedchain_adapter import PDFEmbedchainAdapter
+from crewai_tools.tools.pdf_search_tool.pdf_search_tool import FixedPDFSearchToolSchema
+from embedchain import App
+from embedchain.models.data_type import DataType
+
+from crews.settings import EMBEDDING_BACKEND, EMBEDDING_BACKENDS, INDEX_DIR, REGULATION_PDFS
+from crews.tools import RegulationSearchTool
+from utils.functions import file_digest
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("crews.retrieval").logger
+
+
+_tools: Dict[Tuple[str, str, str], List[RegulationSearchTool]] = {}
+_lock = threading.Lock()
+
+
+def regulation_index_key(pdfs: List[str] = REGULATION_PDFS, backend: str = EMBEDDING_BACKEND) -> str:
+    """
+    Derives the collection name of the regulation index from the PDF contents and
+    the embedding backend, so that any change in the source documents yields a fresh
+    index and vectors of different models never share a collection.
+
+    Args:
+        pdfs (List[str]): Paths of the indexed PDFs.
+        backend (str): One of `EMBEDDING_BACKENDS`.
+
+    Returns:
+        str: The collection name, e.g. ``regulations-1a2b3c4d5e6f7a8b`` for OpenAI
+            embeddings (named as before backends were selectable) or
+            ``regulations-local-1a2b3c4d5e6f7a8b``.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    combined = hashlib.sha256("".join(file_digest(pdf) for pdf in pdfs).encode()).hexdigest()
+    prefix = "regulations" if backend == "openai" else f"regulations-{backend}"
+    return f"{prefix}-{combined[:16]}"
+
+
+def _manifest_path(collection: str) -> str:
+    return os.path.join(INDEX_DIR, f"{collection}.json")
+
+
+def _index_config(collection: str, api_key: str, model: str) -> dict:
+    return {
+        "app": {"config": {"id": collection}},
+        "llm": {"provider": "openai", "config": {"model": model, "api_key": api_key}},
+        "embedder": {"provider": "openai", "config": {"api_key": api_key}},
+        "vectordb": {
+            "provider": "chroma",
+            "config": {"collection_name": collection, "dir": INDEX_DIR, "allow_reset": False},
+        },
+    }
+
+
+def _local_app(collection: str, api_key: str, model: str) -> App:
+    # Deferred: loads onnxruntime and the model only when the local backend is used.
+    from embedchain.config import AppConfig, BaseLlmConfig, ChromaDbConfig
+    from embedchain.llm.openai import OpenAILlm
+    from embedchain.vectordb.chroma import ChromaDB
+    from crews.embeddings import LocalEmbedder
+
+    return App(
+        config=AppConfig(id=collection),
+        db=ChromaDB(config=ChromaDbConfig(collection_name=collection, dir=INDEX_DIR, allow_reset=False)),
+        embedding_model=LocalEmbedder(),
+        llm=OpenAILlm(config=BaseLlmConfig(model=model, api_key=api_key)),
+    )
+
+
+def is_index_built(collection: str) -> bool:
+    return os.path.exists(_manifest_path(collection))
+
+
+def build_regulation_index(app: App, collection: str, pdfs: List[str] = REGULATION_PDFS) -> None:
+    """
+    Chunks and embeds the regulation PDFs into the given collection and records
+    a manifest of the content hashes once every document has been ingested.
+
+    Args:
+        app (App): The embedchain app bound to the target collection.
+        collection (str): The collection name returned by `regulation_index_key`.
+        pdfs (List[str]): Paths of the PDFs to ingest.
+    """
+    for pdf in pdfs:
+        logger.info(f"Indexing {pdf} into {collection}.")
+        app.add(pdf, data_type=DataType.PDF_FILE)
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    with open(_manifest_path(collection), "w", encoding="utf-8") as f:
+        json.dump({"collection": collection, "pdfs": {pdf: file_digest(pdf) for pdf in pdfs}}, f, ensure_ascii=False, indent=2)
+
+
+def load_regulation_app(api_key: str, model: str, backend: str = EMBEDDING_BACKEND) -> App:
+    """
+    Opens the regulation index of an embedding backend, building it if needed.
+
+    Args:
+        api_key (str): The OpenAI API key, used for embeddings by the "openai" backend.
+        model (str): The model name of the retrieval LLM.
+        backend (str): One of `EMBEDDING_BACKENDS`.
+
+    Returns:
+        App: The embedchain app bound to the index.
+    """
+    collection = regulation_index_key(backend=backend)
+    if backend == "local":
+        app = _local_app(collection, api_key, model)
+    else:
+        app = App.from_config(config=_index_config(collection, api_key, model))
+    if not is_index_built(collection):
+        build_regulation_index(app, collection)
+    else:
+        logger.debug(f"Loading prebuilt regulation index {collection}.")
+    return app
+
+
+def _load_regulation_tools(api_key: str, model: str, backend: str) -> List[RegulationSearchTool]:
+    app = load_regulation_app(api_key, model, backend)
+
+    # One tool per document, all backed by the same collection. The adapter
+    # filters by source, and no `pdf` argument is exposed, so queries never
+    # trigger ingestion. `source` keys the shared retrieval cache.
+    return [
+        RegulationSearchTool(
+            adapter=PDFEmbedchainAdapter(embedchain_app=app, src=pdf),
+            description=f"A tool that can be used to semantic search a query the {pdf} PDF's content.",
+            args_schema=FixedPDFSearchToolSchema,
+            source=f"{regulation_index_key(backend=backend)}:{file_digest(pdf)}:{app.llm.config.number_documents}",
+        )
+        for pdf in REGULATION_PDFS
+    ]
+
+
+def get_regulation_search_tools(api_key: str, model: str, backend: str = EMBEDDING_BACKEND) -> List[RegulationSearchTool]:
+    """
+    Returns the process-wide PDF search tools over the prebuilt regulation index,
+    building the index on first use.
+
+    Args:
+        api_key (str): The OpenAI API key used for embeddings.
+        model (str): The model name of the retrieval LLM.
+        backend (str): One of `EMBEDDING_BACKENDS`. Defaults to the `EMBEDDING_BACKEND` setting.
+
+    Returns:
+        List[RegulationSearchTool]: One search tool per regulation PDF.
+    """
+    key = (regulation_index_key(backend=backend), api_key, model)
+    with _lock:
+        if key not in _tools:
+            _tools[key] = _load_regulation_tools(api_key, model, backend)
+        return _tools[key]
+
+
+def clear_regulation_tools() -> None:
+    """
+    Drops the loaded search tools and their embedchain apps. The index on disk is
+    kept; it is rebuilt only when the PDF contents change.
+    """
+    with _lock:
+        _tools.clear()
+
+
+if __name__ == "__main__":
+    # Prebuild the index offline: `python -m crews.retrieval [openai|local]`
+    import sys
+
+    load_regulation_app(os.getenv("OPENAI_API_KEY"), os.getenv("OPENAI_MODEL_NAME", "gpt-4o"),
+                        sys.argv[1] if len(sys.argv) > 1 else EMBEDDING_BACKEND)
@@ -0,0 +1,113 @@
+# crews/routing.py
+"""
+Per-agent model routing, importable by the UI without loading crewai.
+
+Each agent runs on the model named by its `model` key in crews/config/agents.yaml,
+and the vision tool on the `vision_model` of the detector. Detection and assessment
+only describe and rate hazards, which a small model does well, so only
+`risk_reduction_expert`, which writes the measures, is configured with a larger
+one. A profile replaces the configured routes, and overrides from the UI or the
+command line replace single routes on top of the profile.
+"""
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import yaml
+
+from crews.settings import MODEL
+
+
+CONFIG_DIR = Path(__file__).parent / "config"
+
+# crewai's own default for agents and planning when no LLM is given
+DEFAULT_AGENT_MODEL = os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini")
+
+AGENT_ROUTES = ["integrated_risk_detector", "risk_assessment_expert", "risk_reduction_expert"]
+VISION_ROUTE = "vision"      # Model of the site vision tool; must be an OpenAI model
+PLANNING_ROUTE = "planning"  # Planner of the hierarchical mode
+ROUTES = AGENT_ROUTES + [VISION_ROUTE, PLANNING_ROUTE]
+
+# "configured": the models of agents.yaml. The others route every call to one model.
+ROUTING_PROFILES = {
+    "configured": {},
+    "economy": {route: "gpt-4o-mini" for route in ROUTES},
+    "quality": {route: "gpt-4o" for route in ROUTES},
+}
+ROUTING_PROFILE = os.getenv("ROUTING_PROFILE", "configured")
+
+
+def configured_routes() -> Dict[str, str]:
+    """
+    Reads the routes configured in agents.yaml.
+
+    Returns:
+        Dict[str, str]: The model name per route of `ROUTES`.
+    """
+    with open(CONFIG_DIR / "agents.yaml", encoding="utf-8") as f:
+        agents = yaml.safe_load(f)
+    routes = {name: agents[name].get("model") or DEFAULT_AGENT_MODEL for name in AGENT_ROUTES}
+    routes[VISION_ROUTE] = agents["integrated_risk_detector"].get("vision_model") or MODEL
+    routes[PLANNING_ROUTE] = DEFAULT_AGENT_MODEL
+    return routes
+
+
+def resolve_routes(profile: str = ROUTING_PROFILE, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Resolves the model of every route.
+
+    Args:
+        profile (str): One of `ROUTING_PROFILES`.
+        overrides (Optional[Dict[str, str]]): Models replacing single routes of the profile.
+
+    Returns:
+        Dict[str, str]: The model name per route of `ROUTES`.
+
+    Raises:
+        ValueError: If the profile or a route is unknown, a model is not one of the
+            commercial models, or the vision route is not an OpenAI model.
+    """
+    from api.models import get_company_name
+
+    if profile not in ROUTING_PROFILES:
+        raise ValueError(f"profile should be one of {list(ROUTING_PROFILES)} (given: {profile})")
+    unknown = set(overrides or {}) - set(ROUTES)
+    if unknown:
+        raise ValueError(f"routes should be among {ROUTES} (given: {sorted(unknown)})")
+
+    routes = {**configured_routes(), **ROUTING_PROFILES[profile], **(overrides or {})}
+    for route, model_name in routes.items():
+        if get_company_name(model_name) == "opensource":
+            raise ValueError(f"The {route} route needs a commercial model (given: {model_name})")
+    if get_company_name(routes[VISION_ROUTE]) != "OpenAI":
+        raise ValueError(f"The vision tool needs an OpenAI model (given: {routes[VISION_ROUTE]})")
+    return routes
+
+
+def parse_route_overrides(items: Iterable[str]) -> Dict[str, str]:
+    """
+    Parses command-line overrides of the form "route=model".
+
+    Args:
+        items (Iterable[str]): e.g. ["risk_reduction_expert=claude-3-5-sonnet-20240620"].
+
+    Returns:
+        Dict[str, str]: The model name per overridden route.
+
+    Raises:
+        ValueError: If an item is not of the form "route=model".
+    """
+    overrides = {}
+    for item in items:
+        route, sep, model_name = item.partition("=")
+        if not sep or not route.strip() or not model_name.strip():
+            raise ValueError(f"Route overrides should look like route=model (given: {item})")
+        overrides[route.strip()] = model_name.strip()
+    return overrides
+
+
+def routes_signature(routes: Dict[str, str]) -> str:
+    """
+    Renders routes in the fixed order of `ROUTES`, e.g. for cache keys and reports.
+    """
+    return ",".join(f"{route}={routes[route]}" for route in ROUTES)
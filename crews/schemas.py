@@ -0,0 +1,98 @@
+# crews/schemas.py
+import re
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from crews.scoring import ACCEPTABLE, ACCEPTABLE_GRADE, UNACCEPTABLE, score
+from utils.functions import transform_to_json_format_debug_fixed
+
+
+class AssessedRisk(BaseModel):
+    """One row of the `risk_assessment` table."""
+    factor: str = Field(..., description="위험 요인")
+    severity: int = Field(..., ge=1, le=4, description="심각도(S), 1에서 4까지의 점수")
+    frequency: int = Field(..., ge=1, le=4, description="빈도(F), 1에서 4까지의 점수")
+    grade: int = Field(0, description="위험 등급, 시스템이 계산하므로 작성하지 않음")
+    level: str = Field("", description="위험 수준, 시스템이 계산하므로 작성하지 않음")
+    reason: str = Field("", description="심각도 및 빈도 평가 점수의 이유")
+
+    @model_validator(mode="after")
+    def _score(self) -> "AssessedRisk":
+        # Grade and level are computed, never taken from the model (see `crews.scoring`).
+        self.grade = int(score([self.severity], [self.frequency])[0])
+        self.level = ACCEPTABLE if self.grade <= ACCEPTABLE_GRADE else UNACCEPTABLE
+        return self
+
+
+class RiskAssessmentTable(BaseModel):
+    """Structured output of the `risk_assessment` task."""
+    risks: List[AssessedRisk] = Field(..., description="평가된 위험 요인 목록")
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"번호": i, "위험 요인": risk.factor, "심각도(S)": risk.severity, "빈도(F)": risk.frequency,
+             "위험 등급": str(risk.grade), "위험 수준": risk.level}
+            for i, risk in enumerate(self.risks, start=1)
+        ]
+
+
+class RiskReduction(BaseModel):
+    """One row of the `risk_reduction` table."""
+    factor: str = Field(..., description="위험 요인")
+    grade: int = Field(..., ge=1, le=16, description="위험 평가 결과의 위험 등급")
+    measures: List[str] = Field(default_factory=list, description="위험 저감 대책 목록")
+
+
+class RiskReductionTable(BaseModel):
+    """Structured output of the `risk_reduction` task."""
+    risks: List[RiskReduction] = Field(..., description="위험 요인별 위험 저감 대책 목록")
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """
+        Converts the table into the rows produced by `transform_to_json_format_debug_fixed`,
+        so that both output modes render the same way.
+
+        Returns:
+            List[Dict[str, Any]]: Rows with "번호", "위험 요인", "위험 등급" and "위험 저감 대책".
+        """
+        return [
+            {
+                "번호": i,
+                "위험 요인": risk.factor,
+                "위험 등급": str(risk.grade),
+                "위험 저감 대책": "".join(f" - {measure}" for measure in risk.measures) or "생략 가능",
+            }
+            for i, risk in enumerate(self.risks, start=1)
+        ]
+
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def extract_rows(output) -> List[Dict[str, Any]]:
+    """
+    Returns the result table of a crew run regardless of the output mode.
+
+    Structured outputs are read from `output.pydantic`, or validated from the raw JSON
+    when the output was restored from the result cache. Free-form outputs are parsed
+    with `transform_to_json_format_debug_fixed`.
+
+    Args:
+        output (CrewOutput | TaskOutput): The output of the `risk_reduction` task or of the crew.
+
+    Returns:
+        List[Dict[str, Any]]: Rows with "번호", "위험 요인", "위험 등급" and "위험 저감 대책".
+    """
+    table = getattr(output, "pydantic", None)
+    if not isinstance(table, RiskReductionTable):
+        raw = _FENCE.sub("", output.raw.strip())
+        table = None
+        if raw.startswith("{"):
+            try:
+                table = RiskReductionTable.model_validate_json(raw)
+            except ValidationError:
+                pass
+    if table is not None:
+        return table.to_rows()
+    return transform_to_json_format_debug_fixed(output.raw)
@@ -0,0 +1,259 @@
+# crews/scoring.py
+"""
+Deterministic risk scoring.
+
+The `risk_assessment` agent only rates severity (S) and frequency (F). Grades
+(S × F), acceptability and the hazards that need reduction measures are computed
+here with numpy, over every hazard of a run or of a whole batch at once, and only
+the hazards that need measures are handed to `risk_reduction`.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+from pydantic import ValidationError
+
+
+# Grades up to this are acceptable. Every higher grade, not only those of 8 and up
+# that tasks.yaml used to single out, is unacceptable and needs measures.
+ACCEPTABLE_GRADE = 3
+ACCEPTABLE, UNACCEPTABLE = "용납 가능", "용납 불가"
+OMITTED = "생략 가능"
+
+TABLE_ROW = re.compile(r"^\s*\|(.+)\|\s*$")
+SEPARATOR_CELL = re.compile(r"^:?-{3,}:?$")
+NUMBER = re.compile(r"\d+")
+REDUCTION_GRADE = re.compile(r"(\*\*위험 요인\*\*:\s*(.+?)\s*\n\s*-\s*\*\*위험 등급\*\*:\s*)(\d+)")
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+@dataclass
+class Hazard:
+    """A hazard as rated by the `risk_assessment` agent."""
+    factor: str
+    severity: int
+    frequency: int
+    reason: str = ""
+
+
+class ScoredTable:
+    """
+    The hazards of one assessment with their computed grades.
+
+    Attributes:
+        hazards (List[Hazard]): The rated hazards, in the agent's order.
+        grades (np.ndarray): S × F per hazard.
+        needs_reduction (np.ndarray): Whether each hazard needs reduction measures.
+    """
+
+    def __init__(self, hazards: List[Hazard], grades: np.ndarray, needs_reduction: np.ndarray):
+        self.hazards = hazards
+        self.grades = grades
+        self.needs_reduction = needs_reduction
+
+    @property
+    def levels(self) -> List[str]:
+        return np.where(self.needs_reduction, UNACCEPTABLE, ACCEPTABLE).tolist()
+
+    def downstream(self) -> List[int]:
+        """
+        Returns the indices of the hazards that need measures, highest grade first.
+        """
+        selected = np.flatnonzero(self.needs_reduction)
+        return selected[np.argsort(-self.grades[selected], kind="stable")].tolist()
+
+    def to_markdown(self, notes: str = "") -> str:
+        """
+        Renders the hazards that need measures as the assessment table handed to `risk_reduction`.
+
+        Args:
+            notes (str): The agent's explanations below its table. Lines naming a hazard
+                that was not selected are dropped.
+
+        Returns:
+            str: A markdown table, followed by the reasons of the selected hazards.
+        """
+        selected = self.downstream()
+        if not selected:
+            return "위험 저감 대책이 필요한 위험 요인이 없습니다."
+        lines = ["| 위험 요인 | 심각도(S) | 빈도(F) | 위험 등급 | 위험 수준 |", "|---|---|---|---|---|"]
+        for i in selected:
+            hazard = self.hazards[i]
+            lines.append(f"| {hazard.factor} | {hazard.severity} | {hazard.frequency} | {self.grades[i]} | {UNACCEPTABLE} |")
+
+        excluded = [self.hazards[i].factor for i in np.flatnonzero(~self.needs_reduction)]
+        reasons = [f"- {self.hazards[i].factor}: {self.hazards[i].reason}" for i in selected if self.hazards[i].reason]
+        if not reasons:
+            reasons = [line for line in notes.splitlines()
+                       if line.strip() and not any(factor and factor in line for factor in excluded)]
+        return "\n".join(lines + ([""] + reasons if reasons else []))
+
+
+def score(severity: Sequence[int], frequency: Sequence[int]) -> np.ndarray:
+    """
+    Computes the grades of any number of hazards at once.
+
+    Args:
+        severity (Sequence[int]): Severity ratings. Values outside 1-4 are clipped.
+        frequency (Sequence[int]): Frequency ratings. Values outside 1-4 are clipped.
+
+    Returns:
+        np.ndarray: S × F per hazard.
+    """
+    return np.clip(np.asarray(severity, dtype=np.int64), 1, 4) * np.clip(np.asarray(frequency, dtype=np.int64), 1, 4)
+
+
+def score_tables(tables: Sequence[List[Hazard]]) -> List[ScoredTable]:
+    """
+    Scores the hazards of several assessments, e.g. a whole batch, in one pass.
+
+    Args:
+        tables (Sequence[List[Hazard]]): The hazards of each assessment.
+
+    Returns:
+        List[ScoredTable]: One scored table per assessment, in order.
+    """
+    hazards = [hazard for table in tables for hazard in table]
+    grades = score([h.severity for h in hazards], [h.frequency for h in hazards])
+    needs_reduction = grades > ACCEPTABLE_GRADE
+    bounds = np.cumsum([len(table) for table in tables])[:-1]
+    return [
+        ScoredTable(list(table), table_grades, table_needs)
+        for table, table_grades, table_needs in zip(tables, np.split(grades, bounds), np.split(needs_reduction, bounds))
+    ]
+
+
+def _cell_number(cell: str) -> Optional[int]:
+    match = NUMBER.search(cell)
+    return int(match.group()) if match else None
+
+
+def parse_markdown(raw: str) -> List[Hazard]:
+    """
+    Reads the hazards from the first markdown table with severity and frequency columns.
+
+    Args:
+        raw (str): The free-form output of `risk_assessment`.
+
+    Returns:
+        List[Hazard]: The rated hazards; empty if no such table was found.
+    """
+    hazards: List[Hazard] = []
+    columns = None
+    for line in raw.splitlines():
+        match = TABLE_ROW.match(line)
+        if not match:
+            if hazards:
+                break  # End of the table
+            continue
+        cells = [cell.strip().strip("*").strip() for cell in match.group(1).split("|")]
+        if columns is None:
+            factor = next((i for i, cell in enumerate(cells) if "요인" in cell), None)
+            severity = next((i for i, cell in enumerate(cells) if "심각도" in cell), None)
+            frequency = next((i for i, cell in enumerate(cells) if "빈도" in cell), None)
+            if None not in (factor, severity, frequency):
+                columns = (factor, severity, frequency)
+            continue
+        if all(SEPARATOR_CELL.match(cell) for cell in cells if cell) or len(cells) <= max(columns):
+            continue
+        s, f = _cell_number(cells[columns[1]]), _cell_number(cells[columns[2]])
+        if s is not None and f is not None:
+            hazards.append(Hazard(cells[columns[0]], s, f))
+    return hazards
+
+
+def parse_assessment(output) -> List[Hazard]:
+    """
+    Reads the rated hazards from the output of `risk_assessment` in either output mode.
+
+    Args:
+        output (TaskOutput): The task output.
+
+    Returns:
+        List[Hazard]: The rated hazards; empty if none could be read.
+    """
+    from crews.schemas import RiskAssessmentTable
+
+    table = getattr(output, "pydantic", None)
+    if not isinstance(table, RiskAssessmentTable):
+        raw = _FENCE.sub("", output.raw.strip())
+        table = None
+        if raw.startswith("{"):
+            try:
+                table = RiskAssessmentTable.model_validate_json(raw)
+            except ValidationError:
+                pass
+    if table is not None:
+        return [Hazard(risk.factor, risk.severity, risk.frequency, risk.reason) for risk in table.risks]
+    return parse_markdown(output.raw)
+
+
+def _table_end(raw: str) -> int:
+    # Offset just past the first markdown table, where the agent's explanations begin.
+    lines, seen = raw.splitlines(keepends=True), False
+    offset = 0
+    for line in lines:
+        if TABLE_ROW.match(line):
+            seen = True
+        elif seen:
+            break
+        offset += len(line)
+    return offset
+
+
+def apply_to_assessment(output, scored: ScoredTable) -> None:
+    """
+    Replaces the assessment output with the computed grades of the hazards that need
+    measures, which is what `risk_reduction` receives as context.
+
+    Args:
+        output (TaskOutput): The output of `risk_assessment`, modified in place.
+        scored (ScoredTable): Its scored hazards.
+    """
+    from crews.schemas import AssessedRisk, RiskAssessmentTable
+
+    if isinstance(output.pydantic, RiskAssessmentTable):
+        output.pydantic = RiskAssessmentTable(risks=[
+            AssessedRisk(factor=scored.hazards[i].factor, severity=scored.hazards[i].severity,
+                         frequency=scored.hazards[i].frequency, reason=scored.hazards[i].reason)
+            for i in scored.downstream()
+        ])
+        output.raw = output.pydantic.model_dump_json()
+    else:
+        output.raw = scored.to_markdown(notes=output.raw[_table_end(output.raw):])
+
+
+def apply_to_reduction(output, scored: ScoredTable) -> None:
+    """
+    Overrides the grades restated by `risk_reduction` with the computed ones and
+    appends the acceptable hazards, which were never sent to the agent, as "생략 가능".
+
+    Args:
+        output (TaskOutput): The output of `risk_reduction`, modified in place.
+        scored (ScoredTable): The scored hazards of the run.
+    """
+    from crews.schemas import RiskReduction, RiskReductionTable
+
+    grades = {hazard.factor: int(grade) for hazard, grade in zip(scored.hazards, scored.grades)}
+
+    if isinstance(output.pydantic, RiskReductionTable):
+        table = output.pydantic
+        for risk in table.risks:
+            risk.grade = grades.get(risk.factor, risk.grade)
+        listed = {risk.factor for risk in table.risks}
+        table.risks.extend(RiskReduction(factor=scored.hazards[i].factor, grade=int(scored.grades[i]))
+                           for i in np.flatnonzero(~scored.needs_reduction) if scored.hazards[i].factor not in listed)
+        output.raw = table.model_dump_json()
+        return
+
+    listed = [match.group(2).strip() for match in REDUCTION_GRADE.finditer(output.raw)]
+    raw = REDUCTION_GRADE.sub(lambda m: f"{m.group(1)}{grades.get(m.group(2).strip(), m.group(3))}", output.raw)
+    missing = [i for i in np.flatnonzero(~scored.needs_reduction) if scored.hazards[i].factor not in listed]
+    blocks = [
+        f"{len(listed) + n}. **위험 요인**: {scored.hazards[i].factor}\n"
+        f"  - **위험 등급**: {scored.grades[i]}\n"
+        f"  - **위험 저감 대책**: {OMITTED}"
+        for n, i in enumerate(missing, start=1)
+    ]
+    output.raw = "\n\n".join([raw.rstrip()] + blocks) if blocks else raw
@@ -0,0 +1,35 @@
+# crews/settings.py
+# Lightweight crew settings, importable by the UI without loading crewai.
+import os
+
+
+MODEL="gpt-4o"
+
+# "hierarchical": manager LLM delegates the tasks after a planning round.
+# "sequential": the tasks run in order, each handing its output to the next.
+EXECUTION_MODES = ["hierarchical", "sequential"]
+
+위험성평가_이행점검_매뉴얼 = "src/pdfs/붙임1._2022_위험성평가_이행점검_매뉴얼.pdf"
+위험성평가에_관한_지침 = "src/pdfs/사업장 위험성평가에 관한 지침(고용노동부고시)(제2023-19호)(20230522).pdf"
+산업안전보건기준에_관한_규칙 = "src/pdfs/산업안전보건기준에 관한 규칙(고용노동부령)(제00417호)(20240628).pdf"
+
+REGULATION_PDFS = [
+    위험성평가_이행점검_매뉴얼,
+    위험성평가에_관한_지침,
+    산업안전보건기준에_관한_규칙,
+]
+
+# Short names used when citing the documents
+REGULATION_TITLES = {
+    위험성평가_이행점검_매뉴얼: "위험성평가 이행점검 매뉴얼",
+    위험성평가에_관한_지침: "사업장 위험성평가에 관한 지침",
+    산업안전보건기준에_관한_규칙: "산업안전보건기준에 관한 규칙",
+}
+
+# Directory of the prebuilt regulation indexes
+INDEX_DIR = "db"
+
+
+# "openai": provider embeddings. "local": multilingual-e5-small on the CPU, see crews/embeddings.py.
+EMBEDDING_BACKENDS = ["openai", "local"]
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
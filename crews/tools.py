@@ -0,0 +1,227 @@
+# crews/tools.py
+import os
+import re
+import base64
+import threading
+from typing import Dict, List, Optional, Tuple, Type
+
+from crewai.tools import BaseTool
+from crewai_tools import PDFSearchTool
+from openai import OpenAI
+from pydantic import BaseModel, Field, PrivateAttr
+
+from crews.cache import image_digest, retrieval_cache
+from utils.images import load_image, split_images
+from utils.metrics import timed_tool
+from utils.phash import image_index
+
+
+VISION_BATCH_SIZE = int(os.getenv("VISION_BATCH_SIZE", "6"))    # Images per vision request
+VISION_MAX_TOKENS = int(os.getenv("VISION_MAX_TOKENS", "300"))  # Response tokens per image
+
+
+class SiteImageSchema(BaseModel):
+    """Input for SiteVisionTool."""
+    image_path_url: str = Field(..., description="The image path or URL. Several images are given one per line and analyzed together.")
+
+
+class SiteVisionTool(BaseTool):
+    """
+    Describes construction site images with an OpenAI vision model.
+
+    Unlike `crewai_tools.VisionTool`, which builds its client from the
+    process environment, the client is bound to `api_key`, so concurrent runs
+    with different credentials cannot interfere with each other. Several photos
+    of a work area are sent together, `VISION_BATCH_SIZE` per request, instead
+    of one request (and one crew run) per photo.
+
+    Attributes:
+        model (str): The vision model name.
+        api_key (Optional[str]): The OpenAI API key of this tool.
+    """
+    name: str = "Vision Tool"
+    description: str = "This tool uses OpenAI's Vision API to describe the contents of one or more images of the same site."
+    args_schema: Type[BaseModel] = SiteImageSchema
+    model: str = "gpt-4o"
+    api_key: Optional[str] = None
+    _client: Optional[OpenAI] = PrivateAttr(default=None)
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    def _image_url(self, image_path_url: str) -> str:
+        if image_path_url.startswith(("http://", "https://", "data:")):
+            return image_path_url
+        # Uploads arrive as in-memory references, local paths are preprocessed on the fly.
+        image = load_image(image_path_url)
+        return f"data:{image.mime};base64,{base64.b64encode(image.data).decode('utf-8')}"
+
+    def _describe(self, images: List[str], numbers: List[int], total: int) -> str:
+        if total == 1:
+            prompt = "What's in this image?"
+        else:
+            labels = ", ".join(f"'사진 {number}'" for number in numbers)
+            prompt = (f"These photos show the same work area. Describe what is in each photo, "
+                      f"starting each description with its own line {labels} in the order given.")
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        *({"type": "image_url", "image_url": {"url": self._image_url(image)}} for image in images),
+                    ],
+                }
+            ],
+            max_tokens=VISION_MAX_TOKENS * len(images),
+        )
+        return response.choices[0].message.content
+
+    @timed_tool
+    def _run(self, image_path_url: str, **kwargs) -> str:
+        images = split_images(image_path_url)
+        if not images:
+            return "Image Path or URL is required."
+
+        # Photos whose near-duplicate was described before reuse that description.
+        keys = [_vision_key(image) for image in images]
+        descriptions: Dict[int, str] = {}
+        for i, key in enumerate(keys):
+            stored = image_index.vision(key) if key else None
+            if stored is not None:
+                descriptions[i] = stored
+        pending = [i for i in range(len(images)) if i not in descriptions]
+
+        blocks: List[Tuple[int, str]] = []
+        for start in range(0, len(pending), VISION_BATCH_SIZE):
+            batch = pending[start:start + VISION_BATCH_SIZE]
+            text = self._describe([images[i] for i in batch], [i + 1 for i in batch], len(images))
+            sections = [text] if len(batch) == 1 else _split_photo_sections(text, [i + 1 for i in batch])
+            if sections is None:
+                blocks.append((batch[0], text))  # Unlabelled answer: used as is, not stored
+                continue
+            for i, section in zip(batch, sections):
+                descriptions[i] = section
+                if keys[i]:
+                    image_index.store_vision(keys[i], section)
+
+        if len(images) == 1 and 0 in descriptions:
+            return descriptions[0]
+        blocks.extend((i, f"사진 {i + 1}\n{text}") for i, text in descriptions.items())
+        return "\n\n".join(text for _, text in sorted(blocks))
+
+
+PHOTO_LABEL = re.compile(r"^\W*사진\s*(\d+)\W*$", re.MULTILINE)
+
+
+def _split_photo_sections(text: str, numbers: List[int]) -> Optional[List[str]]:
+    # Splits a multi-photo description at its '사진 N' lines; None unless every photo has one.
+    labels = list(PHOTO_LABEL.finditer(text))
+    if [int(label.group(1)) for label in labels] != numbers:
+        return None
+    ends = [label.start() for label in labels[1:]] + [len(text)]
+    return [text[label.end():end].strip() for label, end in zip(labels, ends)]
+
+
+def _vision_key(image: str) -> Optional[str]:
+    # Canonical digest of a photo, None for images that cannot be hashed (e.g. URLs).
+    try:
+        return image_digest(image, canonical=True)
+    except (OSError, KeyError):
+        return None
+
+
+_vision_tools: Dict[Tuple[Optional[str], str], SiteVisionTool] = {}
+_vision_lock = threading.Lock()
+
+
+def get_site_vision_tool(api_key: Optional[str], model: str = "gpt-4o") -> SiteVisionTool:
+    """
+    Returns the process-wide vision tool for a key and model, so that every crew
+    using the same key shares one OpenAI client and its connection pool.
+
+    Args:
+        api_key (Optional[str]): The OpenAI API key of the tool.
+        model (str): The vision model name.
+
+    Returns:
+        SiteVisionTool: The shared tool.
+    """
+    with _vision_lock:
+        if (api_key, model) not in _vision_tools:
+            _vision_tools[(api_key, model)] = SiteVisionTool(model=model, api_key=api_key)
+        return _vision_tools[(api_key, model)]
+
+
+def clear_vision_tools() -> None:
+    with _vision_lock:
+        _vision_tools.clear()
+
+
+class RegulationSearchTool(PDFSearchTool):
+    """
+    `PDFSearchTool` over one regulation PDF whose calls are timed in the run metrics.
+    Results are memoized in `retrieval_cache`, so repeated queries from any agent or
+    run skip the embedding call and the vector search.
+
+    Attributes:
+        source (str): Identifies the searched index, PDF content and top-k in cache keys.
+            Empty disables the cache.
+    """
+    source: str = ""
+
+    @timed_tool
+    def _run(self, query: str, **kwargs) -> str:
+        if not self.source:
+            return super()._run(query=query, **kwargs)
+        key = retrieval_cache.key(self.source, query)
+        result = retrieval_cache.get(key)
+        if result is None:
+            result = super()._run(query=query, **kwargs)
+            retrieval_cache.put(key, result)
+        return result
+
+
+class RegulationLookupSchema(BaseModel):
+    """Input for RegulationLookupTool."""
+    query: str = Field(..., description="조문 번호(예: '제14조', '제42조 제1항 제2호') 또는 검색할 키워드")
+
+
+class RegulationLookupTool(BaseTool):
+    """
+    Answers regulation queries from the offline lexical index in `crews.lexical`:
+    cited articles are returned verbatim, keywords are ranked with BM25.
+    No embedding or network call is made.
+    """
+    name: str = "Regulation Lookup Tool"
+    description: str = (
+        "산업안전보건기준에 관한 규칙, 사업장 위험성평가에 관한 지침, 위험성평가 이행점검 매뉴얼의 조문을 찾습니다. "
+        "조문 번호(예: '제14조', '제42조 제1항')를 입력하면 해당 조문 원문을, 키워드를 입력하면 관련 조문을 반환합니다. "
+        "다른 문서의 조문은 '지침 제5조'처럼 문서 이름을 함께 입력하세요."
+    )
+    args_schema: Type[BaseModel] = RegulationLookupSchema
+
+    @timed_tool
+    def _run(self, query: str, **kwargs) -> str:
+        from crews.lexical import get_lexical_index  # Deferred: parses the PDFs if no index is stored
+
+        return get_lexical_index().answer(query)
+
+
+_lookup_tool: Optional[RegulationLookupTool] = None
+_lookup_lock = threading.Lock()
+
+
+def get_regulation_lookup_tool() -> RegulationLookupTool:
+    """
+    Returns the process-wide regulation lookup tool.
+    """
+    global _lookup_tool
+    with _lookup_lock:
+        if _lookup_tool is None:
+            _lookup_tool = RegulationLookupTool()
+        return _lookup_tool
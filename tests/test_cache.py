@@ -0,0 +1,46 @@
+# tests/test_cache.py
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("deprecated")
+
+from crews.cache import ResultCache  # noqa: E402
+from utils import functions  # noqa: E402
+
+
+def test_result_cache_evicts_least_recently_used_by_running_size(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_entries=2)
+    cache.put("a", {"raw": "a"})
+    cache.put("b", {"raw": "b"})
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", {"raw": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+    assert cache._bytes == sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+
+
+def test_result_cache_evicts_beyond_max_bytes(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_bytes=300)
+    for key in "abcd":
+        cache.put(key, {"raw": key * 100})
+    assert cache._bytes <= 300
+    assert cache.get("d") is not None and cache.get("a") is None
+
+
+def test_result_cache_key_is_scoped_by_api_key():
+    cache = ResultCache()
+    assert cache.key(None, "작업", "gpt-4o", scope="user-a") != cache.key(None, "작업", "gpt-4o", scope="user-b")
+
+
+def test_file_digest_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(functions, "FILE_DIGEST_CACHE_SIZE", 3)
+    functions._digests.clear()
+    for i in range(5):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bytes([i]) * 10)
+        functions.file_digest(str(path))
+    assert len(functions._digests) == 3
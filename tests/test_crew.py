@@ -0,0 +1,42 @@
+# tests/test_crew.py
+import pytest
+
+pytest.importorskip("crewai")
+
+import master  # noqa: F401,E402  (swap sqlite3 before chromadb is imported)
+
+from benchmarks.stub import stub_backend  # noqa: E402
+from crews.crew import crew_pool, run_crew  # noqa: E402
+
+
+TASK = "공종: 빔 거푸집 설치 작업, 공정: 자재 인양"
+
+
+def _pooled():
+    return [obj for entries in crew_pool._idle.values() for _, obj in entries]
+
+
+@pytest.mark.parametrize("mode", ["sequential", "hierarchical"])
+def test_pooled_crew_is_reset_and_reused(mode):
+    with stub_backend() as stubs:
+        model = stubs["get_model"]("gpt-4o")
+        first = run_crew(model, None, TASK, use_cache=False, tools_api_key="stub", mode=mode)
+        pooled = _pooled()
+        assert len(pooled) == 1  # The reset succeeded, so the crew went back to the pool
+
+        crew = pooled[0].built_crew
+        assert all(task.output is None and task.used_tools == 0 for task in crew.tasks)
+        assert all(agent._times_executed == 0 for agent in crew.agents)
+
+        second = run_crew(model, None, TASK, use_cache=False, tools_api_key="stub", mode=mode)
+        assert _pooled() == pooled
+        assert second.raw == first.raw
+
+
+@pytest.mark.parametrize("mode", ["sequential", "hierarchical"])
+def test_every_task_reaches_the_task_callback(mode):
+    outputs = []
+    with stub_backend() as stubs:
+        model = stubs["get_model"]("gpt-4o")
+        run_crew(model, None, TASK, use_cache=False, tools_api_key="stub", mode=mode, task_callback=outputs.append)
+    assert [output.name for output in outputs] == ["integrated_risk_detection", "risk_assessment", "risk_reduction"]
@@ -0,0 +1,36 @@
+# tests/test_images.py
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from utils import images  # noqa: E402
+from utils.images import join_images, load_image, pin_images, preprocess_image, split_images  # noqa: E402
+
+
+def _photo(shade: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 24), (shade, shade, shade)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_paths_with_commas_survive_join_and_split():
+    paths = ["/data/site A, north/1.jpg", "/data/site B/2, 3.jpg"]
+    assert split_images(join_images(paths)) == paths
+
+
+def test_pinned_references_are_not_evicted(monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_CACHE_SIZE", 2)
+    pinned = preprocess_image(_photo(0))
+    release = pin_images(join_images([pinned.ref]))
+    for shade in range(1, 5):
+        preprocess_image(_photo(shade))
+    assert load_image(pinned.ref) is pinned
+
+    release()
+    release()  # Releasing twice has no effect
+    assert pinned.digest not in images._pins
+    preprocess_image(_photo(5))
+    with pytest.raises(KeyError):
+        load_image(pinned.ref)
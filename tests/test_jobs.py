@@ -0,0 +1,51 @@
+# tests/test_jobs.py
+import threading
+
+from utils.jobs import CANCELLED, JobManager
+
+
+def _retrying(step, attempts):
+    # Mimics crewai's `Agent.execute_task`, which retries on any `Exception`.
+    for _ in range(3):
+        attempts.append(1)
+        try:
+            return step()
+        except Exception:
+            continue
+
+
+def test_cancelled_job_stops_without_retrying_the_task():
+    manager = JobManager(workers=1)
+    started, attempts = threading.Event(), []
+
+    def func(job):
+        job.on_task(object())
+        started.set()
+        job._cancelled.wait(5)
+        _retrying(lambda: job.on_step(object()), attempts)
+        job.on_task(object())  # Never reached
+
+    job = manager.submit("owner", "작업", func)
+    started.wait(5)
+    job.cancel()
+    job._future.result(5)
+    assert job.status == CANCELLED
+    assert len(attempts) == 1
+    assert len(job.outputs) == 1
+
+
+def test_cancelled_job_stops_before_its_next_task():
+    manager = JobManager(workers=1)
+    started, steps = threading.Event(), []
+
+    def func(job):
+        started.set()
+        job._cancelled.wait(5)
+        job.on_task(object())
+        steps.append(1)  # Never reached
+
+    job = manager.submit("owner", "작업", func)
+    started.wait(5)
+    job.cancel()
+    job._future.result(5)
+    assert job.status == CANCELLED and not steps
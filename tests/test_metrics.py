@@ -0,0 +1,35 @@
+# tests/test_metrics.py
+from types import SimpleNamespace
+
+from utils.metrics import RunMetrics
+
+
+def _crew():
+    tasks = [SimpleNamespace(name="integrated_risk_detection", tools_errors=0),
+             SimpleNamespace(name="risk_reduction", tools_errors=1)]
+    agents = [SimpleNamespace(role="위험 식별 전문가", _times_executed=0),
+              SimpleNamespace(role="위험 저감 전문가", _times_executed=1)]
+    return SimpleNamespace(tasks=tasks, agents=agents, manager_agent=None)
+
+
+def test_finish_records_tool_errors_and_retries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The metrics file is written below the working directory
+    metrics = RunMetrics()
+    with metrics.activate(_crew()):
+        pass
+    metrics.finish()
+
+    kinds = {record["kind"]: record for record in metrics.records}
+    assert kinds["tool_errors"]["task"] == "risk_reduction" and kinds["tool_errors"]["count"] == 1
+    assert kinds["retry"]["agent"] == "위험 저감 전문가" and kinds["retry"]["count"] == 1
+    assert kinds["run"]["status"] == "ok"
+
+
+def test_finish_keeps_the_error_that_ended_the_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metrics = RunMetrics()
+    with metrics.activate(_crew()):
+        pass
+    metrics.finish(error=KeyboardInterrupt())
+    assert metrics.records[-1]["status"] == "error"
+    assert metrics.records[-1]["error"].startswith("KeyboardInterrupt")
@@ -0,0 +1,87 @@
+# tests/test_phash.py
+import io
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+from utils.phash import PHASH_MAX_DISTANCE, PerceptualIndex, hamming_distances, perceptual_hash  # noqa: E402
+
+
+def _scene(seed: int, size=(640, 480)) -> "Image.Image":
+    # A gradient sky, ground and a few structures, like a site photo in broad strokes.
+    rng = random.Random(seed)
+    image = Image.new("RGB", size)
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    horizon = rng.randint(height // 3, 2 * height // 3)
+    for y in range(height):
+        shade = int(255 * y / height)
+        draw.line([(0, y), (width, y)], fill=(shade, 180 - shade // 2, 255 - shade) if y < horizon else (120, 90 + shade // 4, 60))
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle([x, y, x + rng.randint(20, 200), y + rng.randint(20, 200)],
+                       fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image
+
+
+def _encode(image: "Image.Image", fmt: str = "PNG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _near_duplicate(image: "Image.Image") -> bytes:
+    # Re-encoded, downscaled and shifted by a few pixels
+    width, height = image.size
+    shifted = image.crop((4, 3, width, height)).resize((width * 3 // 4, height * 3 // 4))
+    return _encode(shifted, "JPEG", quality=70)
+
+
+def test_near_duplicates_hash_close_and_other_scenes_far():
+    original = _scene(1)
+    phash = perceptual_hash(_encode(original))
+    duplicate = perceptual_hash(_near_duplicate(original))
+    others = [perceptual_hash(_encode(_scene(seed))) for seed in range(2, 8)]
+
+    hashes = np.array([duplicate, *others], dtype=np.uint64)
+    distances = hamming_distances(hashes, phash)
+    assert distances[0] <= PHASH_MAX_DISTANCE
+    assert all(distance > PHASH_MAX_DISTANCE for distance in distances[1:])
+
+
+def test_hamming_distances_match_bit_counts():
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(1000)] + [0, (1 << 64) - 1]
+    query = rng.getrandbits(64)
+    distances = hamming_distances(np.array(values, dtype=np.uint64), query)
+    assert distances.tolist() == [bin(value ^ query).count("1") for value in values]
+
+
+def test_index_lookup_is_read_only_and_indexed_photos_are_reused(tmp_path):
+    paths = {}
+    for name, data in (("a", _encode(_scene(1))), ("dup", _near_duplicate(_scene(1))), ("other", _encode(_scene(2)))):
+        paths[name] = str(tmp_path / f"{name}.png")
+        with open(paths[name], "wb") as f:
+            f.write(data)
+
+    index = PerceptualIndex(path=str(tmp_path / "images.sqlite3"))
+    assert index.canonical_digest(paths["a"], "a") == "a"
+    assert index.nearest(perceptual_hash(_encode(_scene(1)))) is None  # The lookup did not index the photo
+
+    assert index.add(paths["a"], "a")
+    assert index.canonical_digest(paths["dup"], "dup") == "a"
+    assert not index.add(paths["dup"], "dup")
+    assert index.canonical_digest(paths["other"], "other") == "other"
+
+    index.store_vision("a", "크레인 인양 작업 현장")
+    assert index.vision("a") == "크레인 인양 작업 현장"
+    with index.refreshing():
+        assert index.vision("a") is None
+
+    reopened = PerceptualIndex(path=str(tmp_path / "images.sqlite3"))
+    assert reopened.canonical_digest(paths["dup"], "dup") == "a"
+    assert reopened.vision("a") == "크레인 인양 작업 현장"
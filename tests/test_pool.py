@@ -0,0 +1,92 @@
+# tests/test_pool.py
+import threading
+import time
+
+import pytest
+
+from crews.pool import CrewPool
+
+
+def test_reuses_released_object():
+    pool = CrewPool(size=1)
+    built = []
+
+    def factory():
+        built.append(object())
+        return built[-1]
+
+    with pool.acquire("a", factory) as first:
+        pass
+    with pool.acquire("a", factory) as second:
+        pass
+    assert first is second
+    assert len(built) == 1
+
+
+def test_drops_object_that_fails_to_reset():
+    def reset(obj):
+        raise ValueError("broken")
+
+    pool = CrewPool(reset=reset, size=1)
+    with pool.acquire("a", object) as first:
+        pass
+    with pool.acquire("a", object) as second:
+        pass
+    assert first is not second
+
+
+def test_release_wakes_waiter_of_same_key_among_others():
+    pool = CrewPool(size=1)
+    holder_a, holder_b = threading.Event(), threading.Event()
+    release_a = threading.Event()
+    acquired = []
+
+    def hold(key, event):
+        with pool.acquire(key, object):
+            event.set()
+            release_a.wait(5)
+
+    threads = [threading.Thread(target=hold, args=("a", holder_a)), threading.Thread(target=hold, args=("b", holder_b))]
+    for thread in threads:
+        thread.start()
+    holder_a.wait(5)
+    holder_b.wait(5)
+
+    def wait_for(key):
+        with pool.acquire(key, object):
+            acquired.append(key)
+
+    waiters = [threading.Thread(target=wait_for, args=(key,)) for key in ("b", "a")]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+    release_a.set()
+    for thread in threads + waiters:
+        thread.join(5)
+    assert sorted(acquired) == ["a", "b"]
+
+
+def test_forgets_released_keys_and_caps_idle_objects():
+    pool = CrewPool(size=1, max_idle=2)
+    for key in ("a", "b", "c"):
+        with pool.acquire(key, object):
+            pass
+    assert pool._busy == {}
+    assert sorted(pool._idle) == ["b", "c"]
+
+
+def test_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        CrewPool(size=0)
+    with pytest.raises(ValueError):
+        CrewPool(max_idle=0)
+
+
+def test_objects_checked_out_during_clear_are_not_pooled_again():
+    pool = CrewPool(size=2)
+    with pool.acquire("a", object) as stale:
+        pool.clear()
+    with pool.acquire("a", object) as fresh:
+        pass
+    assert fresh is not stale
+    assert [obj for _, obj in pool._idle["a"]] == [fresh]
@@ -1,13 +1,17 @@
 # utils/components.py
 import os
+import uuid
 
 import streamlit as st
 from dotenv import load_dotenv
 
 from api.registry import register_api_key, get_api_key, get_api_name_from_model_name, init_api_key_registry_session, USER_CREDENTIALS
 from api.models import COMMERCIAL_MODELS, get_company_name
-from utils.functions import get_args, get_image_path, is_streamlit_running
+from utils.functions import get_args, is_streamlit_running, json_to_html_table, get_tasks_into_chart
+from utils.images import join_images, preprocess_image, retain_image
+from utils.jobs import Job, job_manager, QUEUED, RUNNING, DONE, FAILED, CANCELLED
 from utils.logs import LoggerSetup
+from utils.parsing import iter_risk_rows
 
 
 # Load environment variables once
@@ -16,6 +20,22 @@ load_dotenv()
 # Set logger for debugging
 logger = LoggerSetup("utils.components").logger
 
+# Tasks of `RiskAssessmentCrew` in execution order, with the section title of their partial output
+TASK_SECTIONS = [
+    ("integrated_risk_detection", "1️⃣ 식별된 유해·위험 요인"),
+    ("risk_assessment", "2️⃣ 위험성 평가 (심각도·빈도)"),
+    ("risk_reduction", "3️⃣ 위험 저감 대책"),
+]
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))  # Seconds between job status refreshes
+JOB_STATUS_LABELS = {
+    QUEUED: "⏳ 대기 중",
+    RUNNING: "🔄 실행 중",
+    DONE: "✅ 완료",
+    FAILED: "❌ 실패",
+    CANCELLED: "⛔ 취소됨",
+}
+
 def page_config(title: str):
     st.set_page_config(
         page_title=title,
@@ -25,15 +45,145 @@ def page_config(title: str):
     st.title(title)
 
 
+def session_owner() -> str:
+    """
+    Returns the owner of the jobs submitted from this session: the logged-in user,
+    or an id kept in the session state. Only a logged-in user finds their jobs
+    again after a disconnect.
+    """
+    if st.session_state.get("username"):
+        return st.session_state["username"]
+    if "session_owner" not in st.session_state:
+        st.session_state["session_owner"] = f"anonymous-{uuid.uuid4().hex}"
+    return st.session_state["session_owner"]
+
+
+def _stream_risk_rows(text: str) -> None:
+    """
+    Renders the rows of a `risk_reduction` output into one table as they are parsed,
+    or the text itself while it holds no complete row yet (e.g. structured output).
+    """
+    table = st.empty()
+    rows = []
+    for row in iter_risk_rows(text.splitlines(keepends=True)):
+        rows.append(row)
+        table.html(json_to_html_table(rows))
+    if not rows:
+        table.markdown(text or "에이전트가 분석 중입니다...")
+
+
+def _render_job(job: Job) -> None:
+    names = [name for name, _ in TASK_SECTIONS]
+    with st.container(border=True):
+        st.markdown(f"### [평가대상작업] {get_tasks_into_chart(job.label)}")
+        st.caption(f"{JOB_STATUS_LABELS[job.status]} · 작업 ID {job.id}")
+        if job.active:
+            st.progress(min(len(job.outputs), len(names)) / len(names), text=job.caption or JOB_STATUS_LABELS[job.status])
+            st.button("취소", key=f"cancel-{job.id}", on_click=job.cancel)
+
+        outputs = list(job.outputs)
+        for i, output in enumerate(outputs):
+            name = getattr(output, "name", None)
+            index = names.index(name) if name in names else min(i, len(names) - 1)
+            # Until the final table is shown, the reductions are drawn as a table already.
+            reducing = job.active and names[index] == "risk_reduction"
+            with st.expander(TASK_SECTIONS[index][1], expanded=reducing):
+                if reducing:
+                    _stream_risk_rows(output.raw)
+                else:
+                    st.markdown(output.raw)
+
+        if job.status == RUNNING and len(outputs) < len(names):
+            # The section being written, with the latest message of its agent
+            name, title = TASK_SECTIONS[len(outputs)]
+            partial = job.partial
+            with st.expander(f"{title} (작성 중)", expanded=True):
+                if name == "risk_reduction":
+                    _stream_risk_rows(partial)
+                else:
+                    st.markdown(partial or "에이전트가 분석 중입니다...")
+
+        if job.status == DONE:
+            from crews.schemas import extract_rows  # Deferred: pydantic models are loaded with the first result
+
+            result = job.result
+            try:
+                st.html(json_to_html_table(extract_rows(result)))
+            except Exception as e:
+                st.error("결과 형식이 올바르지 않습니다.")
+                logger.error(e)
+            else:
+                st.markdown("### 펼쳐서 Agent 생각 보기 👇")
+                st.json(result.tasks_output, expanded=False)
+                st.markdown("### 펼쳐서 사용량 보기 👇")
+                metrics = job.extra.get("metrics")
+                st.json({"token_usage": result.token_usage.model_dump() if result.token_usage else None,
+                         "metrics": metrics.summary() if metrics else None}, expanded=False)
+                st.markdown("### 펼쳐서 Raw 데이터 보기 👇")
+                st.json(result, expanded=False)
+                st.success("위험성 평가표 작성이 완료되었습니다.")
+        elif job.status == FAILED:
+            st.error(f"작업 처리 중 오류 발생: {job.error}")
+        elif job.status == CANCELLED:
+            st.warning("작업이 취소되었습니다.")
+
+        if not job.active:
+            st.button("목록에서 지우기", key=f"remove-{job.id}", on_click=job_manager.remove, args=(job.id,))
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def _polling_job_panel(owner: str) -> None:
+    jobs = job_manager.jobs_for(owner)
+    if not any(job.active for job in jobs):
+        st.rerun()  # Redraws the page with the static panel, which stops the polling
+    for job in jobs:
+        _render_job(job)
+
+
+@st.fragment
+def _static_job_panel(owner: str) -> None:
+    for job in job_manager.jobs_for(owner):
+        _render_job(job)
+
+
+def job_panel(owner: str) -> None:
+    """
+    Shows the status, partial outputs and results of the owner's jobs, newest first.
+    While a job is queued or running, only the panel reruns every `JOB_POLL_INTERVAL`
+    seconds, so the rest of the page stays responsive; otherwise nothing is polled.
+
+    Args:
+        owner (str): The owner returned by `session_owner`.
+    """
+    if any(job.active for job in job_manager.jobs_for(owner)):
+        _polling_job_panel(owner)
+    else:
+        _static_job_panel(owner)
+
+
 def image_handler(description: str):
     image_placeholder = st.empty()
-    image_file = st.sidebar.file_uploader(description, type=["jpg", "jpeg", "png"])
+    image_files = st.sidebar.file_uploader(description, type=["jpg", "jpeg", "png"], accept_multiple_files=True,
+                                           help="같은 작업 구역의 사진을 여러 장 올리면 한 번의 평가로 함께 분석합니다.")
+
+    if image_files:
+        # Reruns reuse the prepared images instead of reading and hashing the uploads again.
+        cached = st.session_state.get("prepared_images", {})
+        prepared = {}
+        for image_file in image_files:
+            image = cached.get(image_file.file_id)
+            if image is not None:
+                retain_image(image)
+            else:
+                image = preprocess_image(image_file.getvalue())  # 축소·재압축 후 메모리에 보관
+            prepared[image_file.file_id] = image
+        st.session_state["prepared_images"] = prepared
+
+        images = list(prepared.values())
+        image_placeholder.image([image.data for image in images], caption=[image_file.name for image_file in image_files],
+                                width=750 if len(images) == 1 else 240)
 
-    if image_file:
-        image_path = get_image_path(image_file)  # 업로드된 파일을 임시 경로에 저장
-        image_placeholder.image(image_file, caption=image_file.name, width=750)
-        
-        return image_path
+        return join_images([image.ref for image in images])
 
     else:
         st.warning("현장 이미지를 입력하시면 더 정확한 분석이 가능합니다.", icon="⚠️")
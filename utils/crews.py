@@ -1,10 +1,18 @@
 # utils/crews.py
-from api.registry import get_api_key, OPENAI_API_KEY
+from typing import Dict
+
+from api.models import get_company_name
+from api.registry import get_api_key, ANTHROPIC_API_KEY, OPENAI_API_KEY
 from utils.logs import LoggerSetup
 
 
 logger = LoggerSetup("utils.crews").logger
 
+DEFAULT_API_KEYS = {
+    "OpenAI": OPENAI_API_KEY,
+    "Anthropic": ANTHROPIC_API_KEY,
+}
+
 def set_openai_api_key_for_crewtools(model_name: str) -> str:
     registered_openai_api_key = get_api_key(model_name)
     if registered_openai_api_key:
@@ -12,4 +20,27 @@ def set_openai_api_key_for_crewtools(model_name: str) -> str:
         return registered_openai_api_key
     else:
         logger.info("Consuming SNUCEM's property for providing vision service.")
-        return OPENAI_API_KEY
\ No newline at end of file
+        return OPENAI_API_KEY
+
+
+def get_provider_api_keys(routes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Resolves the API key of each provider among the routed models, preferring the
+    customer registered key of the provider.
+
+    Args:
+        routes (Dict[str, str]): Model name per route, see `crews.routing`.
+
+    Returns:
+        Dict[str, str]: API key per provider, keyed like `COMMERCIAL_MODELS`.
+    """
+    api_keys = {}
+    for model_name in routes.values():
+        provider = get_company_name(model_name)
+        if provider in api_keys:
+            continue
+        registered_api_key = get_api_key(model_name)
+        if registered_api_key:
+            logger.info(f"Routing {provider} models with customer registered API key.")
+        api_keys[provider] = registered_api_key or DEFAULT_API_KEYS[provider]
+    return api_keys
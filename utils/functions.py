@@ -1,11 +1,53 @@
 # utils/functions.py
+import os
 import re
+import hashlib
 import tempfile
+import threading
+from collections import OrderedDict
 from deprecated import deprecated
 
 import json
 from typing import Any, List
-from PIL import Image, ExifTags
+
+from utils.parsing import RiskTableParser
+
+
+FILE_DIGEST_CACHE_SIZE = int(os.getenv("FILE_DIGEST_CACHE_SIZE", "1024"))
+
+_digests: "OrderedDict[tuple, str]" = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """
+    Computes the SHA-256 digest of a file, memoized on its size and mtime. The
+    `FILE_DIGEST_CACHE_SIZE` most recently used digests are kept.
+
+    Args:
+        path (str): Path of the file to hash.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+    with _digests_lock:
+        _digests[key] = digest
+        while len(_digests) > FILE_DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
 
 
 def get_args(**kwargs) -> List[Any]:
@@ -27,6 +69,8 @@ def is_streamlit_running() -> bool:
 
 
 def extract_caption(image_path):
+    from PIL import Image, ExifTags  # Deferred: PIL is only needed once an image is handled
+
     try:
         image = Image.open(image_path)
         exif_data = image._getexif()  # Get EXIF metadata
@@ -236,6 +280,7 @@ def raw_to_md_table_fixed(raw_text):
     return md_table, debug_log
 
 
+@deprecated(version='1.2.0', reason="Use utils.images.preprocess_image for in-memory handoff.")
 def get_image_path(uploaded_file):
     if uploaded_file is None:
         return None
@@ -248,6 +293,7 @@ def get_image_path(uploaded_file):
 def transform_to_json_format_debug_fixed(raw_text):
     """
     Transforms the raw text into a JSON format with consistent parsing.
+    To consume an output while it is still being produced, use `utils.parsing.iter_risk_rows`.
 
     Args:
         raw_text (str): Input raw text in the given format.
@@ -255,54 +301,8 @@ def transform_to_json_format_debug_fixed(raw_text):
     Returns:
         list: JSON-formatted data.
     """
-    lines = raw_text.strip().splitlines()
-    json_output = []
-    current_entry = {}
-    capturing_measures = False  # Flag to handle multi-line "위험 저감 대책"
-
-    for line in lines:
-        line = line.strip()
-
-        # New entry for "위험 요인"
-        if re.match(r"^\d+\.\s\*\*위험 요인\*\*:", line):
-            if current_entry:
-                json_output.append(current_entry)
-                current_entry = {}
-            capturing_measures = False
-            match = re.match(r"^\d+\.\s\*\*위험 요인\*\*:\s(?P<factor>.+)", line)
-            if match:
-                current_entry["번호"] = len(json_output) + 1
-                current_entry["위험 요인"] = match.group("factor").strip()
-
-        # Parse "위험 등급"
-        elif re.match(r"^\s*-?\s*\*\*위험 등급\*\*:", line):
-            capturing_measures = False
-            match = re.match(r"^\s*-?\s*\*\*위험 등급\*\*:\s*(?P<grade>\d+)", line)
-            if match:
-                current_entry["위험 등급"] = match.group("grade").strip()
-
-        # Parse "위험 저감 대책"
-        elif re.match(r"^\s*-?\s*\*\*위험 저감 대책\*\*:", line):
-            capturing_measures = True
-            match = re.match(r"^\s*-?\s*\*\*위험 저감 대책\*\*:\s*(?P<measures>.+)", line)
-            if match:
-                current_entry["위험 저감 대책"] = match.group("measures").strip()
-            else:
-                current_entry["위험 저감 대책"] = ""
-
-        # Handle additional lines for "위험 저감 대책"
-        elif capturing_measures:
-            # Continue capturing measures for multi-line entries
-            if "위험 저감 대책" in current_entry:
-                current_entry["위험 저감 대책"] += f" {line.strip()}"
-            else:
-                current_entry["위험 저감 대책"] = line.strip()
-
-    # Add the last entry
-    if current_entry:
-        json_output.append(current_entry)
-
-    return json_output
+    parser = RiskTableParser()
+    return parser.feed(raw_text) + parser.close()
 
 
 def dict_to_markdown_table(data_dict: dict) -> str:
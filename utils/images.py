@@ -0,0 +1,218 @@
+# utils/images.py
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1568"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG")
+IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", "64"))
+
+IMAGE_REF_PREFIX = "image://"
+IMAGE_SEPARATOR = "\n"  # Between the images of a multi-photo input; cannot occur in paths, URLs or references
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """
+    A preprocessed image held in memory.
+
+    Attributes:
+        data (bytes): The encoded, downscaled image.
+        mime (str): The MIME type of `data`.
+        digest (str): SHA-256 of the original (unprocessed) content.
+    """
+    data: bytes
+    mime: str
+    digest: str
+
+    @property
+    def ref(self) -> str:
+        """
+        A reference that can be passed through crew inputs in place of a file path
+        and resolved again with `load_image`.
+        """
+        return f"{IMAGE_REF_PREFIX}{self.digest}"
+
+
+_variants: "OrderedDict[Tuple[str, int, int, str], PreparedImage]" = OrderedDict()
+_refs: "OrderedDict[str, PreparedImage]" = OrderedDict()
+_pins: Dict[str, int] = {}  # Digest -> number of holders that need the reference to stay resolvable
+_lock = threading.Lock()
+
+
+def _trim_refs() -> None:
+    # Pinned references are skipped, so the cache may exceed its size while jobs hold them.
+    excess = len(_refs) - IMAGE_CACHE_SIZE
+    if excess > 0:
+        for digest in [digest for digest in _refs if digest not in _pins][:excess]:
+            del _refs[digest]
+
+
+def _remember(key: Tuple[str, int, int, str], image: PreparedImage) -> None:
+    with _lock:
+        _variants[key] = image
+        _variants.move_to_end(key)
+        _refs[image.digest] = image
+        _refs.move_to_end(image.digest)
+        while len(_variants) > IMAGE_CACHE_SIZE:
+            _variants.popitem(last=False)
+        _trim_refs()
+
+
+def preprocess_image(data: bytes,
+                     max_dimension: int = IMAGE_MAX_DIMENSION,
+                     quality: int = IMAGE_QUALITY,
+                     image_format: str = IMAGE_FORMAT) -> PreparedImage:
+    """
+    Normalizes an uploaded image for the vision stage: applies the EXIF
+    orientation, bounds the longest side, drops metadata and re-encodes.
+    Results are cached in memory by content hash and settings.
+
+    Args:
+        data (bytes): The original image content (JPEG, PNG, ...).
+        max_dimension (int): Maximum width and height in pixels.
+        quality (int): Encoder quality for lossy formats (1-95).
+        image_format (str): Output format understood by PIL, e.g. "JPEG" or "WEBP".
+
+    Returns:
+        PreparedImage: The processed image.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    key = (digest, max_dimension, quality, image_format)
+    with _lock:
+        if key in _variants:
+            _variants.move_to_end(key)
+            image = _variants[key]
+            _refs[digest] = image
+            _refs.move_to_end(digest)
+            return image
+
+    from PIL import Image, ImageOps  # Deferred: PIL is only needed once an image is handled
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image_format == "JPEG" and image.mode != "RGB":
+            # JPEG has no alpha channel; flatten transparent areas onto white.
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, quality=quality, optimize=True)
+
+    prepared = PreparedImage(
+        data=buffer.getvalue(),
+        mime=_MIME_TYPES.get(image_format, f"image/{image_format.lower()}"),
+        digest=digest,
+    )
+    _remember(key, prepared)
+    return prepared
+
+
+def retain_image(image: PreparedImage) -> str:
+    """
+    Keeps an image that the caller already holds resolvable by its reference,
+    without preprocessing it again.
+
+    Args:
+        image (PreparedImage): An image returned by `preprocess_image`.
+
+    Returns:
+        str: The reference of the image.
+    """
+    with _lock:
+        _refs[image.digest] = image
+        _refs.move_to_end(image.digest)
+        _trim_refs()
+    return image.ref
+
+
+def pin_images(image: Optional[str]) -> Callable[[], None]:
+    """
+    Keeps the references among `image` resolvable until the returned function is
+    called, however many other images are prepared meanwhile, e.g. while a job that
+    holds them is queued and running.
+
+    Args:
+        image (Optional[str]): An image, or several joined with `join_images`.
+
+    Returns:
+        Callable[[], None]: Releases the pins. Calling it more than once has no effect.
+    """
+    digests = [image_ref_digest(part) for part in split_images(image) if is_image_ref(part)]
+    with _lock:
+        for digest in digests:
+            _pins[digest] = _pins.get(digest, 0) + 1
+    released = threading.Event()
+
+    def release() -> None:
+        if released.is_set():
+            return
+        released.set()
+        with _lock:
+            for digest in digests:
+                _pins[digest] -= 1
+                if not _pins[digest]:
+                    del _pins[digest]
+            _trim_refs()
+
+    return release
+
+
+def is_image_ref(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith(IMAGE_REF_PREFIX)
+
+
+def image_ref_digest(ref: str) -> str:
+    return ref[len(IMAGE_REF_PREFIX):]
+
+
+def join_images(images: Union[None, str, Sequence[str]]) -> Optional[str]:
+    """
+    Packs one or several images into the single string passed through crew inputs.
+
+    Args:
+        images (Union[None, str, Sequence[str]]): An image path, URL or reference, a list of them, or None.
+
+    Returns:
+        Optional[str]: The images joined with `IMAGE_SEPARATOR`, or None if there are none.
+    """
+    if isinstance(images, str) or images is None:
+        return images or None
+    return IMAGE_SEPARATOR.join(image for image in images if image) or None
+
+
+def split_images(image: Optional[str]) -> List[str]:
+    """
+    Unpacks a string built by `join_images`.
+    """
+    return [part.strip() for part in (image or "").split(IMAGE_SEPARATOR) if part.strip()]
+
+
+def load_image(image: str) -> PreparedImage:
+    """
+    Resolves an image reference or a file path to a processed in-memory image.
+
+    Args:
+        image (str): A reference from `PreparedImage.ref` or a local file path.
+
+    Returns:
+        PreparedImage: The processed image.
+
+    Raises:
+        KeyError: If the reference is no longer held in memory.
+    """
+    if is_image_ref(image):
+        with _lock:
+            return _refs[image_ref_digest(image)]
+    with open(image, "rb") as f:
+        return preprocess_image(f.read())
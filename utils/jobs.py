@@ -0,0 +1,178 @@
+# utils/jobs.py
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("utils.jobs").logger
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))            # Assessments running at the same time
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "86400"))    # Seconds finished jobs are kept
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobCancelled(BaseException):
+    """
+    Raised from a job's callbacks to stop its crew once cancellation is requested.
+
+    Like `asyncio.CancelledError` it is not an `Exception`, so crewai does not catch
+    it and retry the task (up to `max_retry_limit` more LLM calls per agent).
+    """
+
+
+@dataclass
+class Job:
+    """
+    State of one submitted assessment, written by the worker thread and read by the page.
+
+    Attributes:
+        id (str): Job identifier.
+        owner (str): User (or session) that submitted the job.
+        label (str): Task description shown on the page.
+        status (str): One of "queued", "running", "done", "failed" or "cancelled".
+        caption (str): Current agent activity.
+        partial (str): Latest message of the running agent, until its task completes.
+        outputs (List[Any]): `TaskOutput` of every completed task, in order.
+        result (Any): Return value of the job function once done.
+        error (Optional[str]): Error message if the job failed.
+        extra (Dict[str, Any]): Anything the submitter wants to keep with the job, e.g. metrics.
+    """
+    id: str
+    owner: str
+    label: str
+    status: str = QUEUED
+    caption: str = ""
+    partial: str = ""
+    outputs: List[Any] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+    _future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def on_step(self, step) -> None:
+        """Step callback for `run_crew`; also the point where cancellation takes effect."""
+        if self._cancelled.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled.")
+        tool = getattr(step, "tool", None)
+        self.caption = f"🔄 도구 실행 중: {tool}" if tool else "🔄 에이전트가 분석 중입니다..."
+        self.partial = getattr(step, "text", None) or self.partial
+
+    def on_task(self, output) -> None:
+        """Task callback for `run_crew`; stops the crew before its next task once cancelled."""
+        self.outputs.append(output)
+        self.partial = ""
+        if self._cancelled.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled.")
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self._future is not None and self._future.cancel():
+            self.status, self.finished_at = CANCELLED, time.time()
+
+
+class JobManager:
+    """
+    Runs assessments on a thread pool, detached from the Streamlit script run that
+    submitted them. Jobs live in the server process, so they outlive reruns and
+    browser disconnects, and are looked up again by owner.
+
+    Args:
+        workers (int): Maximum number of jobs running at the same time.
+        retention (int): Seconds a finished job is kept before it is discarded.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: int = JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assessment")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, label: str, func: Callable[[Job], Any],
+               on_finish: Optional[Callable[[], None]] = None) -> Job:
+        """
+        Queues a job.
+
+        Args:
+            owner (str): User or session submitting the job.
+            label (str): Task description shown on the page.
+            func (Callable[[Job], Any]): Runs the work. It receives the job to wire
+                `job.on_step` and `job.on_task` as crew callbacks. Everything it needs
+                from the Streamlit session (API keys, uploads) must be resolved beforehand,
+                since worker threads have no session.
+            on_finish (Callable[[], None], optional): Called once the job has ended,
+                including when it is cancelled before it started, e.g. to release
+                resources held for it.
+
+        Returns:
+            Job: The queued job.
+        """
+        self._prune()
+        job = Job(id=uuid.uuid4().hex[:12], owner=owner, label=label)
+        with self._lock:
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, func)
+        if on_finish is not None:
+            job._future.add_done_callback(lambda _: on_finish())
+        logger.info(f"Job {job.id} queued for {owner}.")
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], Any]) -> None:
+        if job._cancelled.is_set():
+            job.status, job.finished_at = CANCELLED, time.time()
+            return
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            job.result = func(job)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logger.error(f"Job {job.id} failed: {e}")
+        finally:
+            job.caption = ""
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for(self, owner: str) -> List[Job]:
+        """
+        Returns the jobs of an owner, newest first.
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.active:
+                del self._jobs[job_id]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [k for k, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+
+job_manager = JobManager()
@@ -1,14 +1,120 @@
 import os
-import inspect
+import sys
+import queue
+import atexit
 import logging
+import threading
 from datetime import datetime
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+
+ROLLOVER_CHECK_INTERVAL = 64  # Records written between two log file size checks
+
+# Every logger puts its records on one queue, drained by one background writer thread
+# that hands them to the file and stream handlers of their logger name. The handlers
+# are shared by every LoggerSetup instance of that name.
+_records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_handlers: Dict[str, List[logging.Handler]] = {}
+_file_handlers: Dict[str, "RolloverFileHandler"] = {}
+_lock = threading.Lock()
+
+
+class RolloverFileHandler(logging.FileHandler):
+    """
+    A file handler that rolls the log file over once it reaches `max_bytes`.
+    The size is read from the open stream every `ROLLOVER_CHECK_INTERVAL` records
+    instead of being stat-ed on each record.
+
+    Attributes:
+        max_bytes (int): The maximum size of the log file in bytes.
+        backup_count (int): The maximum number of backup log files to keep.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, encoding: str = 'utf-8-sig'):
+        super().__init__(filename, encoding=encoding)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._since_check = ROLLOVER_CHECK_INTERVAL  # Check on the first record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._since_check += 1
+        if self._since_check >= ROLLOVER_CHECK_INTERVAL:
+            self._since_check = 0
+            if self.stream is not None and self.stream.tell() >= self.max_bytes:
+                self.do_rollover()
+        super().emit(record)
+
+    def do_rollover(self) -> None:
+        """
+        Performs a log file rollover.
+        """
+        self.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            sfn = f"{self.baseFilename}.{i}"
+            dfn = f"{self.baseFilename}.{i + 1}"
+            if os.path.exists(sfn):
+                if os.path.exists(dfn):
+                    os.remove(dfn)
+                os.rename(sfn, dfn)
+
+        dfn = f"{self.baseFilename}.1"
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, dfn)
+
+        self.stream = self._open()
+
+
+class _NamedQueueHandler(QueueHandler):
+    """
+    Queues records for the handlers of `target`, the logger this handler is attached
+    to, which may differ from the record's own name when it was propagated.
+    """
+
+    def __init__(self, records: queue.SimpleQueue, target: str):
+        super().__init__(records)
+        self.target = target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)  # A copy
+        record.log_target = self.target
+        return record
+
+
+class _NameDispatcher(logging.Handler):
+    """
+    Passes each queued record to the handlers of its target logger name.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in _handlers.get(record.log_target, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+def _stop_listener() -> None:
+    # Drains the queue so that records logged right before exit are written.
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(_stop_listener)
 
 
 class LoggerSetup:
     """
     A utility class for setting up a logger with file rotation and stream handling.
 
+    Records are put on a queue shared by all loggers and written by one background
+    thread, so logging costs the caller one queue put. Handlers are registered once per logger name:
+    creating another LoggerSetup for the same name, e.g. on a Streamlit rerun,
+    reuses them instead of adding duplicates.
+
     Attributes:
         logger_name (str): The name of the logger, defaults to the caller's module name.
         log_dir (str): The directory where log files will be stored.
@@ -20,7 +126,7 @@ class LoggerSetup:
     Methods:
         logger: Returns the logger instance.
         max_log_size: Gets or sets the maximum log file size based on a size factor.
-        setup_logger(): Sets up the logger with file and stream handlers.
+        setup_logger(): Sets up the logger with queued file and stream handlers, once per name.
     """
 
     def __init__(self, logger_name: Optional[str] = None, log_size_factor: float = 0.8):
@@ -46,8 +152,7 @@ class LoggerSetup:
         self.MAX_LOG_SIZE = self._calculate_max_log_size(log_size_factor)
         self.BACKUP_COUNT = 5  # Max backup files
 
-        # Prepare log directory and set up logger
-        self._prepare_log_directory()
+        # Set up logger (and its log directory) unless another instance already did
         self.setup_logger()
 
     def _get_caller_name(self) -> str:
@@ -57,7 +162,9 @@ class LoggerSetup:
         Returns:
             str: The name of the calling module.
         """
-        return inspect.stack()[2].frame.f_globals["__name__"]
+        # Frame 0 is this method and frame 1 is __init__; `inspect.stack()` would
+        # also read the source of every frame on the stack.
+        return sys._getframe(2).f_globals["__name__"]
 
     def _prepare_log_directory(self):
         """
@@ -114,60 +221,24 @@ class LoggerSetup:
             ValueError: If factor is not between 0.0 and 1.0.
         """
         self.MAX_LOG_SIZE = self._calculate_max_log_size(factor)
+        file_handler = _file_handlers.get(self.logger_name)
+        if file_handler is not None:
+            file_handler.max_bytes = self.MAX_LOG_SIZE
 
-    def _create_file_handler(self) -> logging.FileHandler:
+    def _create_file_handler(self) -> RolloverFileHandler:
         """
         Creates a file handler for logging with rollover support.
 
         Returns:
-            logging.FileHandler: The configured file handler.
+            RolloverFileHandler: The configured file handler.
         """
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8-sig')
+        file_handler = RolloverFileHandler(self.log_file, self.MAX_LOG_SIZE, self.BACKUP_COUNT)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(
             logging.Formatter(r'%(asctime)s [%(name)s, line %(lineno)d] %(levelname)s: %(message)s')
         )
-        file_handler.emit = self._file_emit_with_rollover(file_handler)
         return file_handler
 
-    def _file_emit_with_rollover(self, handler: logging.FileHandler):
-        """
-        Wraps the emit function to handle file size rollover.
-
-        Args:
-            handler (logging.FileHandler): The file handler to wrap.
-
-        Returns:
-            Callable: A wrapped emit function with rollover support.
-        """
-        def emit(record):
-            if os.path.exists(handler.baseFilename) and os.path.getsize(handler.baseFilename) >= self.MAX_LOG_SIZE:
-                self._do_rollover(handler)
-            logging.FileHandler.emit(handler, record)
-        return emit
-
-    def _do_rollover(self, handler: logging.FileHandler):
-        """
-        Performs a log file rollover.
-
-        Args:
-            handler (logging.FileHandler): The file handler for which rollover is performed.
-        """
-        handler.close()
-        for i in range(self.BACKUP_COUNT - 1, 0, -1):
-            sfn = f"{self.log_file}.{i}"
-            dfn = f"{self.log_file}.{i + 1}"
-            if os.path.exists(sfn):
-                if os.path.exists(dfn):
-                    os.remove(dfn)
-                os.rename(sfn, dfn)
-
-        dfn = f"{self.log_file}.1"
-        if os.path.exists(self.log_file):
-            os.rename(self.log_file, dfn)
-
-        handler.stream = handler._open()
-
     def _create_stream_handler(self) -> logging.StreamHandler:
         """
         Creates a stream handler for logging.
@@ -182,10 +253,19 @@ class LoggerSetup:
 
     def setup_logger(self):
         """
-        Sets up the logger with file and stream handlers.
+        Sets up the logger with file and stream handlers behind a queue. Does nothing
+        if the logger of this name has already been set up.
         """
-        file_handler = self._create_file_handler()
-        stream_handler = self._create_stream_handler()
-
-        self._logger.addHandler(file_handler)
-        self._logger.addHandler(stream_handler)
+        global _listener
+        with _lock:
+            if self.logger_name in _handlers:
+                return
+            self._prepare_log_directory()
+            file_handler = self._create_file_handler()
+            _handlers[self.logger_name] = [file_handler, self._create_stream_handler()]
+            _file_handlers[self.logger_name] = file_handler
+
+            if _listener is None:
+                _listener = QueueListener(_records, _NameDispatcher())
+                _listener.start()
+            self._logger.addHandler(_NamedQueueHandler(_records, self.logger_name))
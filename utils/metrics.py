@@ -0,0 +1,300 @@
+# utils/metrics.py
+import os
+import json
+import time
+import uuid
+import threading
+from functools import wraps
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("utils.metrics").logger
+
+METRICS_DIR = os.getenv("METRICS_DIR", "logs/metrics")
+METRICS_PORT = os.getenv("METRICS_PORT")  # Prometheus endpoint is disabled unless set
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters rendered in the Prometheus text exposition format.
+    Durations are exported as `_seconds_sum`/`_seconds_count` pairs.
+    """
+
+    def __init__(self, prefix: str = "risk_assessment"):
+        self.prefix = prefix
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._values[key] += value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        self.inc(f"{name}_seconds_sum", seconds, **labels)
+        self.inc(f"{name}_seconds_count", 1, **labels)
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = []
+        for (name, labels), value in items:
+            label_text = ",".join(f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels)
+            lines.append(f"{self.prefix}_{name}{{{label_text}}} {value}" if label_text else f"{self.prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+_active = threading.local()
+_export_lock = threading.Lock()
+
+
+def current_run() -> Optional["RunMetrics"]:
+    """
+    Returns the run being recorded on this thread, if any.
+    """
+    return getattr(_active, "run", None)
+
+
+def timed_tool(func):
+    """
+    Decorator for a tool's `_run` method that records each call, with its wall
+    time and error status, on the run active in the calling thread.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        error = None
+        try:
+            return func(self, *args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            run = current_run()
+            if run is not None:
+                run.record_tool_call(self.name, time.perf_counter() - started, error)
+    return wrapper
+
+
+def _usage(agent) -> Dict[str, int]:
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is None:
+        return {}
+    summary = token_process.get_summary()
+    return {
+        "prompt_tokens": summary.prompt_tokens,
+        "completion_tokens": summary.completion_tokens,
+        "successful_requests": summary.successful_requests,
+    }
+
+
+class RunMetrics:
+    """
+    Records per-agent, per-task and per-tool latency and token usage of one crew
+    run. Use `on_step` and `on_task` as crew callbacks and wrap the kickoff in
+    `activate` so that tools decorated with `timed_tool` report to this run.
+
+    Attributes:
+        run_id (str): Identifier attached to every record of the run.
+        tags (Dict[str, Any]): Extra fields attached to every record, e.g. mode or model.
+        records (List[Dict[str, Any]]): The recorded events.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, **tags: Any):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.tags = tags
+        self.records: List[Dict[str, Any]] = []
+        self._crew = None
+        self._started = time.perf_counter()
+        self._last_step = self._started
+        self._last_task = self._started
+        self._steps = 0
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, kind: str, **fields: Any) -> None:
+        self.records.append({"run_id": self.run_id, "kind": kind, "ts": time.time(), **self.tags, **fields})
+
+    def _agents(self) -> List[Any]:
+        if self._crew is None:
+            return []
+        agents = list(self._crew.agents)
+        if getattr(self._crew, "manager_agent", None) is not None:
+            agents.append(self._crew.manager_agent)
+        return agents
+
+    @contextmanager
+    def activate(self, crew=None) -> Iterator["RunMetrics"]:
+        """
+        Marks this run as active on the current thread for the duration of the block.
+
+        Args:
+            crew (Crew, optional): The crew being run, used for token, tool error and retry counts.
+        """
+        self._crew = crew
+        self._started = self._last_step = self._last_task = time.perf_counter()
+        self._usage = {agent.role: _usage(agent) for agent in self._agents()}
+        previous, _active.run = current_run(), self
+        try:
+            yield self
+        finally:
+            _active.run = previous
+
+    def on_step(self, step) -> None:
+        now = time.perf_counter()
+        self._steps += 1
+        tool = getattr(step, "tool", None)
+        self._record("step", step=self._steps, tool=tool, seconds=round(now - self._last_step, 3))
+        self._last_step = now
+
+    def on_task(self, output) -> None:
+        now = time.perf_counter()
+        task = getattr(output, "name", None) or f"task_{sum(r['kind'] == 'task' for r in self.records) + 1}"
+        seconds = now - self._last_task
+        self._last_task = now
+        self._record("task", task=task, agent=getattr(output, "agent", None), seconds=round(seconds, 3))
+        registry.observe("task", seconds, task=task)
+
+        # Token deltas of every agent since the previous task, attributed to this task
+        for agent in self._agents():
+            usage = _usage(agent)
+            before = self._usage.get(agent.role, {})
+            delta = {k: v - before.get(k, 0) for k, v in usage.items()}
+            self._usage[agent.role] = usage
+            if any(delta.values()):
+                self._record("agent", task=task, agent=agent.role, **delta)
+                registry.inc("tokens_total", delta["prompt_tokens"], agent=agent.role, type="prompt")
+                registry.inc("tokens_total", delta["completion_tokens"], agent=agent.role, type="completion")
+                registry.inc("llm_requests_total", delta["successful_requests"], agent=agent.role)
+
+    def record_tool_call(self, tool: str, seconds: float, error: Optional[str] = None) -> None:
+        self._record("tool", tool=tool, seconds=round(seconds, 3), error=error)
+        registry.observe("tool", seconds, tool=tool)
+        registry.inc("tool_calls_total", tool=tool, status="error" if error else "ok")
+
+    def finish(self, result=None, error: Optional[BaseException] = None) -> None:
+        """
+        Records the run summary, tool errors per task, failed executions per agent
+        and overall token usage, then appends every record of the run to the metrics
+        JSONL file.
+
+        Args:
+            result (CrewOutput, optional): The output of the run.
+            error (BaseException, optional): The exception that ended the run, if any.
+        """
+        seconds = time.perf_counter() - self._started
+        if self._crew is not None:
+            for task in self._crew.tasks:
+                tool_errors = getattr(task, "tools_errors", 0) or 0
+                if tool_errors:
+                    name = getattr(task, "name", None) or "task"
+                    self._record("tool_errors", task=name, count=tool_errors)
+                    registry.inc("task_tool_errors_total", tool_errors, task=name)
+            # An agent counts the executions of a task that raised; each one below
+            # `max_retry_limit` was retried.
+            for agent in self._agents():
+                failures = getattr(agent, "_times_executed", 0) or 0
+                if failures:
+                    self._record("retry", agent=agent.role, count=failures)
+                    registry.inc("agent_retries_total", failures, agent=agent.role)
+
+        usage = getattr(result, "token_usage", None)
+        status = "error" if error is not None else "ok"
+        self._record(
+            "run",
+            seconds=round(seconds, 3),
+            status=status,
+            error=f"{type(error).__name__}: {error}" if error is not None else None,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            successful_requests=getattr(usage, "successful_requests", None),
+        )
+        registry.observe("run", seconds, status=status)
+        registry.inc("runs_total", status=status)
+        self.export()
+
+    def export(self, directory: str = METRICS_DIR) -> None:
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with _export_lock, open(os.path.join(directory, "metrics.jsonl"), "a", encoding="utf-8") as f:
+                for record in self.records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export metrics of run {self.run_id}: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregates the records for display.
+
+        Returns:
+            Dict[str, Any]: Seconds per task and per tool, and tokens per agent.
+        """
+        summary = {"run_id": self.run_id, "tasks": {}, "tools": {}, "agents": {}}
+        for record in self.records:
+            if record["kind"] == "task":
+                summary["tasks"][record["task"]] = record["seconds"]
+            elif record["kind"] == "tool":
+                tool = summary["tools"].setdefault(record["tool"], {"calls": 0, "seconds": 0.0, "errors": 0})
+                tool["calls"] += 1
+                tool["seconds"] = round(tool["seconds"] + record["seconds"], 3)
+                tool["errors"] += record["error"] is not None
+            elif record["kind"] == "agent":
+                agent = summary["agents"].setdefault(record["agent"], {"prompt_tokens": 0, "completion_tokens": 0})
+                agent["prompt_tokens"] += record["prompt_tokens"]
+                agent["completion_tokens"] += record["completion_tokens"]
+            elif record["kind"] == "run":
+                summary["seconds"] = record["seconds"]
+        return summary
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the console
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Serves `registry` at `/metrics` on a daemon thread. Safe to call on every
+    Streamlit rerun; only the first call starts the server.
+
+    Args:
+        port (Optional[int]): Port to listen on. Defaults to the `METRICS_PORT` environment variable.
+
+    Returns:
+        Optional[ThreadingHTTPServer]: The server, or None if no port is configured.
+    """
+    global _server
+    port = port or (int(METRICS_PORT) if METRICS_PORT else None)
+    if port is None:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"Metrics endpoint not started on port {port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Serving Prometheus metrics on :{port}/metrics")
+    return _server
@@ -0,0 +1,145 @@
+# utils/parsing.py
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# Each pattern recognizes a line and captures its value in one match. The value
+# group is optional so that a bare heading (e.g. "**위험 저감 대책**:") still matches.
+FACTOR_PATTERN = re.compile(r"^\d+\.\s\*\*위험 요인\*\*:(?:\s(?P<factor>.+))?")
+GRADE_PATTERN = re.compile(r"^\s*-?\s*\*\*위험 등급\*\*:(?:\s*(?P<grade>\d+))?")
+MEASURES_PATTERN = re.compile(r"^\s*-?\s*\*\*위험 저감 대책\*\*:(?:\s*(?P<measures>.+))?")
+
+MEASURES = "위험 저감 대책"
+
+
+class RiskTableParser:
+    """
+    Incremental parser for the `risk_reduction` output format.
+
+    Feed text chunks as they arrive; each call returns the rows completed by that
+    chunk, i.e. the entries closed by the start of the next "위험 요인". `close`
+    returns the last entry. Lines are consumed in a single pass and multi-line
+    "위험 저감 대책" are joined once per row, so the cost is linear in the input.
+
+    The rows are identical to those of `transform_to_json_format_debug_fixed` for
+    the concatenated input.
+
+    Example:
+        >>> parser = RiskTableParser()
+        >>> rows = parser.feed(chunk)  # as many times as needed
+        >>> rows += parser.close()
+    """
+
+    def __init__(self):
+        self._pending = ""       # Incomplete last line of the input so far
+        self._blank_lines = 0    # Blank lines not yet known to be followed by text
+        self._entry: Dict[str, Any] = {}
+        self._measures: Optional[List[str]] = None
+        self._capturing = False
+        self._emitted = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consumes a chunk of text.
+
+        Args:
+            chunk (str): The next piece of the output, split anywhere.
+
+        Returns:
+            List[Dict[str, Any]]: Rows completed by this chunk.
+        """
+        lines = (self._pending + chunk).splitlines(keepends=True)
+        self._pending = ""
+        # Hold back a line without its terminator, and a trailing "\r" that may be
+        # the first half of a "\r\n" split across chunks.
+        if lines and (lines[-1].endswith("\r") or lines[-1] == lines[-1].splitlines()[0]):
+            self._pending = lines.pop()
+
+        rows = []
+        for line in lines:
+            row = self._line(line.strip())
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Consumes the remaining input and ends the stream.
+
+        Returns:
+            List[Dict[str, Any]]: The last rows, if any.
+        """
+        rows = []
+        if self._pending:
+            row = self._line(self._pending.strip())
+            self._pending = ""
+            if row is not None:
+                rows.append(row)
+        # Trailing blank lines are dropped, as `str.strip` does for a whole text.
+        self._blank_lines = 0
+        if self._entry:
+            rows.append(self._finish())
+        return rows
+
+    def _finish(self) -> Dict[str, Any]:
+        entry = self._entry
+        if self._measures is not None:
+            entry[MEASURES] = " ".join(self._measures)
+        self._entry, self._measures = {}, None
+        self._emitted += 1
+        return entry
+
+    def _line(self, line: str) -> Optional[Dict[str, Any]]:
+        if not line:
+            self._blank_lines += 1
+            return None
+        if self._blank_lines:
+            # Blank lines inside a multi-line measure each contribute an empty part.
+            if self._capturing:
+                self._measures.extend([""] * self._blank_lines)
+            self._blank_lines = 0
+
+        finished = None
+        match = FACTOR_PATTERN.match(line)
+        if match:
+            if self._entry:
+                finished = self._finish()
+            self._capturing = False
+            if match.group("factor") is not None:
+                self._entry["번호"] = self._emitted + 1
+                self._entry["위험 요인"] = match.group("factor").strip()
+            return finished
+
+        match = GRADE_PATTERN.match(line)
+        if match:
+            self._capturing = False
+            if match.group("grade") is not None:
+                self._entry["위험 등급"] = match.group("grade")
+            return None
+
+        match = MEASURES_PATTERN.match(line)
+        if match:
+            self._capturing = True
+            self._entry[MEASURES] = None  # Keeps the key order; joined in `_finish`
+            self._measures = [match.group("measures").strip() if match.group("measures") is not None else ""]
+            return None
+
+        if self._capturing:
+            self._measures.append(line)
+        return None
+
+
+def iter_risk_rows(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the rows of a `risk_reduction` output as soon as each one is complete.
+
+    Args:
+        chunks (Iterable[str]): The output text, in pieces of any size.
+
+    Yields:
+        Dict[str, Any]: Rows with "번호", "위험 요인", "위험 등급" and "위험 저감 대책".
+    """
+    parser = RiskTableParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
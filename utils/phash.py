@@ -0,0 +1,257 @@
+# utils/phash.py
+"""
+Perceptual-hash index of analyzed site photos.
+
+Every photo gets a 64-bit DCT hash that barely changes under re-encoding, resizing
+or small shifts, so a burst of near-identical shots of one scene maps to the first
+photo analyzed. `canonical_digest` looks that photo's content hash up without
+changing the index; photos are only indexed with `add` once their run succeeded.
+The canonical digest keys the stored vision descriptions (`vision`) and the
+detection-stage checkpoints only: the complete assessment of a near-duplicate is
+never reused, just its description of the scene.
+
+Hashes live in SQLite and are mirrored in a numpy array; a lookup XORs the query
+against all of them and counts bits with a 16-bit lookup table, which takes a few
+milliseconds for hundreds of thousands of photos.
+"""
+import io
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.images import is_image_ref, load_image
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("utils.phash").logger
+
+PHASH_INDEX_PATH = os.getenv("PHASH_INDEX_PATH", "cache/images.sqlite3")
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "6"))  # Hamming distance (of 64 bits) of a near-duplicate
+PHASH_MEMO_SIZE = 4096  # Hashes of recently seen images kept in memory
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+
+_POPCOUNT16 = np.zeros(1 << 16, dtype=np.uint8)
+for _bit in range(16):
+    _POPCOUNT16 += ((np.arange(1 << 16) >> _bit) & 1).astype(np.uint8)
+
+# Orthonormal DCT-II basis: the 2D transform of X is D @ X @ D.T
+_n = np.arange(DCT_SIZE)
+_DCT = np.cos(np.pi * (2 * _n[None, :] + 1) * _n[:, None] / (2 * DCT_SIZE)) * np.sqrt(2 / DCT_SIZE)
+_DCT[0] /= np.sqrt(2)
+
+
+def perceptual_hash(data: bytes) -> int:
+    """
+    Computes the 64-bit pHash of an image: the signs of its lowest 8×8 DCT
+    frequencies relative to their median, on a 32×32 grayscale thumbnail.
+
+    Args:
+        data (bytes): Encoded image content.
+
+    Returns:
+        int: The hash as an unsigned 64-bit integer.
+    """
+    from PIL import Image  # Deferred: PIL is only needed once an image is handled
+
+    with Image.open(io.BytesIO(data)) as image:
+        pixels = np.asarray(image.convert("L").resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    return int.from_bytes(np.packbits(low > np.median(low)).tobytes(), "big")
+
+
+def hamming_distances(hashes: np.ndarray, query: int) -> np.ndarray:
+    """
+    Counts the differing bits between `query` and each of `hashes` (dtype uint64).
+    """
+    diff = np.bitwise_xor(hashes, np.uint64(query))
+    return _POPCOUNT16[diff.view(np.uint16)].reshape(-1, 4).sum(axis=1, dtype=np.uint8)
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit.
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class PerceptualIndex:
+    """
+    Maps photos to the first analyzed near-duplicate and stores their vision output.
+
+    Attributes:
+        path (str): The SQLite database file.
+        max_distance (int): Largest Hamming distance still treated as the same scene.
+    """
+
+    def __init__(self, path: str = PHASH_INDEX_PATH, max_distance: int = PHASH_MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self._db: Optional[sqlite3.Connection] = None
+        self._digests: List[str] = []
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._count = 0
+        self._phashes: Dict[str, int] = {}  # Content digest -> hash of the images seen by this process
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Called with the lock held
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                "digest TEXT PRIMARY KEY, phash INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            # Descriptions are stored while a run is in progress, before its photos are indexed.
+            self._db.execute("CREATE TABLE IF NOT EXISTS visions (digest TEXT PRIMARY KEY, vision TEXT NOT NULL)")
+            rows = self._db.execute("SELECT digest, phash FROM images ORDER BY created_at").fetchall()
+            self._digests = [digest for digest, _ in rows]
+            self._hashes = np.array([phash for _, phash in rows], dtype=np.int64).view(np.uint64)
+            self._count = len(rows)
+            logger.debug(f"Loaded {self._count} perceptual hashes from {self.path}.")
+        return self._db
+
+    def _append(self, digest: str, phash: int) -> None:
+        # Called with the lock held. The array grows geometrically, so appends are amortized O(1).
+        if self._count == len(self._hashes):
+            grown = np.zeros(max(1024, 2 * len(self._hashes)), dtype=np.uint64)
+            grown[:self._count] = self._hashes[:self._count]
+            self._hashes = grown
+        self._hashes[self._count] = np.uint64(phash)
+        self._digests.append(digest)
+        self._count += 1
+
+    def nearest(self, phash: int) -> Optional[Tuple[str, int]]:
+        """
+        Finds the stored photo closest to a hash.
+
+        Returns:
+            Optional[Tuple[str, int]]: Its content digest and distance, or None if the index is empty.
+        """
+        with self._lock:
+            self._connect()
+            if not self._count:
+                return None
+            distances = hamming_distances(self._hashes[:self._count], phash)
+            i = int(np.argmin(distances))
+            return self._digests[i], int(distances[i])
+
+    def _hash(self, image: str, digest: str) -> int:
+        phash = self._phashes.get(digest)
+        if phash is None:
+            phash = perceptual_hash(load_image(image).data)
+            if len(self._phashes) >= PHASH_MEMO_SIZE:
+                self._phashes.clear()
+            self._phashes[digest] = phash
+        return phash
+
+    def canonical_digest(self, image: str, digest: str) -> str:
+        """
+        Returns the content digest of the first indexed near-duplicate of an image,
+        or its own digest when it has none. The index is not modified.
+
+        Args:
+            image (str): An image reference or local file path.
+            digest (str): The image's own content digest.
+
+        Returns:
+            str: The digest to key reusable vision outputs by.
+        """
+        match = self.nearest(self._hash(image, digest))
+        if match is None or match[1] > self.max_distance:
+            return digest
+        if match[0] != digest:
+            logger.debug(f"Image {digest[:12]} is a near-duplicate of {match[0][:12]} (distance {match[1]}).")
+        return match[0]
+
+    def add(self, image: str, digest: str) -> bool:
+        """
+        Indexes an analyzed image, unless it or a near-duplicate already is.
+
+        Args:
+            image (str): An image reference or local file path.
+            digest (str): The image's own content digest.
+
+        Returns:
+            bool: Whether the image was added.
+        """
+        phash = self._hash(image, digest)
+        match = self.nearest(phash)
+        if match is not None and match[1] <= self.max_distance:
+            return False
+        with self._lock:
+            db = self._connect()
+            inserted = db.execute("INSERT OR IGNORE INTO images (digest, phash, created_at) VALUES (?, ?, ?)",
+                                  (digest, _signed(phash), time.time())).rowcount
+            db.commit()
+            if inserted:
+                self._append(digest, phash)
+        return bool(inserted)
+
+    @contextmanager
+    def refreshing(self, enabled: bool = True) -> Iterator[None]:
+        """
+        Within the block, `vision` misses in the calling thread, so stored outputs are regenerated and overwritten.
+        """
+        previous = getattr(self._local, "refresh", False)
+        self._local.refresh = enabled
+        try:
+            yield
+        finally:
+            self._local.refresh = previous
+
+    def vision(self, digest: str) -> Optional[str]:
+        """
+        Returns the stored vision description of a canonical digest.
+        """
+        if getattr(self._local, "refresh", False):
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT vision FROM visions WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def store_vision(self, digest: str, text: str) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("INSERT OR REPLACE INTO visions (digest, vision) VALUES (?, ?)", (digest, text))
+            db.commit()
+
+
+image_index = PerceptualIndex()
+
+
+def _hashable(image: str) -> bool:
+    return is_image_ref(image) or os.path.exists(image)
+
+
+def canonical_image_digest(image: str, digest: str) -> str:
+    """
+    `PerceptualIndex.canonical_digest` of the shared index for references and local
+    files; other images (URLs) keep their own digest.
+    """
+    if not _hashable(image):
+        return digest
+    try:
+        return image_index.canonical_digest(image, digest)
+    except Exception as e:  # Unreadable image or index: fall back to exact matching
+        logger.warning(f"Perceptual hashing failed for {digest[:12]}: {e}")
+        return digest
+
+
+def index_image(image: str, digest: str) -> None:
+    """
+    `PerceptualIndex.add` of the shared index for references and local files.
+    """
+    if not _hashable(image):
+        return
+    try:
+        image_index.add(image, digest)
+    except Exception as e:
+        logger.warning(f"Indexing failed for {digest[:12]}: {e}")
@@ -0,0 +1,49 @@
+# utils/warmup.py
+import os
+import time
+import importlib
+import threading
+from typing import Iterable, Optional
+
+from utils.logs import LoggerSetup
+
+
+logger = LoggerSetup("utils.warmup").logger
+
+WARM_UP = os.getenv("WARM_UP", "1") != "0"  # Set to 0 to import only on first use
+
+_started = False
+_lock = threading.Lock()
+
+
+def warm_up(modules: Iterable[str]) -> Optional[threading.Thread]:
+    """
+    Imports heavy modules on a daemon thread once per process, so that they are
+    ready by the time the first assessment is requested without delaying the
+    first page render. Importing them directly later is always safe.
+
+    Args:
+        modules (Iterable[str]): Dotted module names to import, in order.
+
+    Returns:
+        Optional[threading.Thread]: The warm-up thread, or None if it already ran or is disabled.
+    """
+    global _started
+    with _lock:
+        if _started or not WARM_UP:
+            return None
+        _started = True
+
+    def run():
+        for name in modules:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.warning(f"Warm-up import of {name} failed: {e}")
+                continue
+            logger.debug(f"Warmed up {name} in {time.perf_counter() - started:.2f}s")
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread